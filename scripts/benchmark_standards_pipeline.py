@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""Benchmark the standards artifact scripts on synthetic scaled-up inputs.
+
+Every research input is replicated N times (copy 0 is the shipped data, later
+copies get suffixed ids and shifted criterion codes that stay consistent
+across normative YAMLs, the crosswalk, and the link graph). The scripts then
+run as subprocesses on the synthetic inputs. Wall time and peak RSS are
+compared against a stored baseline.
+
+Baselines are keyed by a machine fingerprint (OS, architecture, Python
+version, CPU count): a run is only compared with results recorded on the
+same class of machine, and scales or scripts without such a result are
+reported as "no baseline".
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import yaml
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from generate_accessibility_rule_comparison import STOPWORDS
+from standards_registry import NORMATIVE_STANDARDS, RESEARCH_DIR
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS_DIR = REPO_ROOT / "scripts"
+BASELINE_VERSION = 2
+DEFAULT_BASELINE = "monitoring/benchmark-baseline.json"
+# These read the dataset written by generate_cross_standard_references, which
+# runs first whenever one of them is selected.
+DATASET_WORKLOADS = {
+    "validate_cross_standard_references",
+    "query_cross_standard_references",
+    "query_cross_standard_references_snapshot",
+    "generate_cross_standard_reference_views",
+}
+
+
+def load_yaml(path: Path):
+    data = yaml.safe_load(path.read_text(encoding="utf-8"))
+    if not isinstance(data, dict):
+        raise ValueError(f"{path} must contain a YAML object")
+    return data
+
+
+def write_yaml(path: Path, data: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(yaml.safe_dump(data, sort_keys=False, allow_unicode=True), encoding="utf-8")
+
+
+def scaled_id(value, copy: int) -> str:
+    return f"{value}-x{copy}" if copy else str(value)
+
+
+def scaled_code(code, copy: int) -> str:
+    # Shift the last number so copies still look like SC codes (1.4.3 -> 1.4.1003).
+    if not copy:
+        return str(code)
+    return re.sub(r"(\d+)$", lambda match: str(int(match.group(1)) + 1000 * copy), str(code))
+
+
+def scaled_title(title, copy: int) -> str:
+    # Suffix the comparable tokens so rule copies only match within their copy.
+    if not copy:
+        return str(title)
+
+    def suffix(match):
+        word = match.group(0)
+        if len(word) < 3 or word.isdigit() or word.lower() in STOPWORDS:
+            return word
+        return f"{word}x{copy}"
+
+    return re.sub(r"[A-Za-z0-9]+", suffix, str(title))
+
+
+def scale_normative(data: dict, scale: int):
+    criteria = []
+    for copy in range(scale):
+        for item in data.get("normative_success_criteria", []):
+            criteria.append({**item, "id": scaled_id(item.get("id", ""), copy), "code": scaled_code(item.get("code", ""), copy)})
+    return {**data, "normative_success_criteria": criteria}
+
+
+def scale_crosswalk(data: dict, scale: int):
+    profiles = {}
+    mappings = []
+    for copy in range(scale):
+        for profile_ref, profile in data.get("target_profiles", {}).items():
+            profiles[scaled_id(profile_ref, copy)] = {
+                **profile,
+                "criterion_codes": [scaled_code(code, copy) for code in profile.get("criterion_codes", [])],
+            }
+        for mapping in data.get("mappings", []):
+            mappings.append(
+                {
+                    **mapping,
+                    "atag_criterion_code": scaled_code(mapping.get("atag_criterion_code", ""), copy),
+                    "atag_criterion_id": scaled_id(mapping.get("atag_criterion_id", ""), copy),
+                    "target_profile_refs": [scaled_id(ref, copy) for ref in mapping.get("target_profile_refs", [])],
+                }
+            )
+    return {**data, "target_profiles": profiles, "mappings": mappings, "mapping_count": len(mappings)}
+
+
+def scale_list(data: dict, keys: list[str], scale: int):
+    out = dict(data)
+    for key in keys:
+        items = data.get(key, [])
+        out[key] = [{**item, "id": scaled_id(item.get("id", ""), copy)} for copy in range(scale) for item in items]
+    return out
+
+
+def scale_rule_catalog(data: dict, scale: int):
+    rule_sets = []
+    for rule_set in data.get("rule_sets", []):
+        rules = [
+            {
+                **rule,
+                "id": scaled_id(rule.get("id", ""), copy),
+                "title": scaled_title(rule.get("title") or rule.get("id", ""), copy),
+            }
+            for copy in range(scale)
+            for rule in rule_set.get("rules", [])
+        ]
+        rule_sets.append({**rule_set, "rules": rules, "rule_count": len(rules)})
+    return {**data, "rule_sets": rule_sets}
+
+
+def scale_link_graph(data: dict, scale: int):
+    # Node copies point their edges back at the shipped nodes so traversals
+    # from the shipped anchors grow with the scale.
+    nodes = data.get("nodes", [])
+    edges = data.get("edges", [])
+    out_nodes = [{**node, "id": scaled_id(node.get("id", ""), copy)} for copy in range(scale) for node in nodes]
+    out_edges = [
+        {**edge, "id": scaled_id(edge.get("id", ""), copy), "from": scaled_id(edge.get("from", ""), copy)}
+        for copy in range(scale)
+        for edge in edges
+    ]
+    return {**data, "nodes": out_nodes, "edges": out_edges}
+
+
+def synthesize_inputs(source_dir: Path, out_dir: Path, scale: int):
+    inputs = {}
+    for entry in NORMATIVE_STANDARDS:
+        name = Path(entry["normative"]["yaml"]).name
+        inputs[entry["normative"]["arg"]] = out_dir / name
+        write_yaml(out_dir / name, scale_normative(load_yaml(source_dir / name), scale))
+
+    simple = {
+        "crosswalk": ("atag-to-wcag-2.2-crosswalk.yaml", scale_crosswalk),
+        "informative": ("w3c-wai-informative-resources.yaml", lambda data, n: scale_list(data, ["resources"], n)),
+        "rule_catalogs": ("accessibility-rule-catalogs.yaml", scale_rule_catalog),
+        "graph": ("standards-link-graph.yaml", scale_link_graph),
+        "html": (
+            "html-living-standard-accessibility.yaml",
+            lambda data, n: scale_list(data, ["full_section_inventory", "accessibility_related_sections"], n),
+        ),
+        "css": (
+            "css-specifications-index.yaml",
+            lambda data, n: scale_list(data, ["full_spec_inventory", "accessibility_relevant_modules"], n),
+        ),
+    }
+    for key, (name, scale_fn) in simple.items():
+        inputs[key] = out_dir / name
+        write_yaml(out_dir / name, scale_fn(load_yaml(source_dir / name), scale))
+    return inputs
+
+
+def build_workloads(inputs: dict, out_dir: Path):
+    normative_args = []
+    for entry in NORMATIVE_STANDARDS:
+        arg = entry["normative"]["arg"]
+        normative_args += [f"--{arg}-yaml", str(inputs[arg])]
+    reference_args = normative_args + [
+        "--crosswalk-yaml",
+        str(inputs["crosswalk"]),
+        "--informative-yaml",
+        str(inputs["informative"]),
+    ]
+    dataset = out_dir / "cross-standard-references.yaml"
+    snapshot = out_dir / "cross-standard-references.snap"
+    query = ["--target-standard", "wcag-2.2", "--relation-type", "inferred_sc_reference_cross_standard"]
+
+    return [
+        (
+            "generate_cross_standard_references",
+            ["generate_cross_standard_references.py", *reference_args, "--out-yaml", str(dataset),
+             "--out-csv", str(out_dir / "cross-standard-references.csv"), "--out-snapshot", str(snapshot)],
+        ),
+        (
+            "validate_cross_standard_references",
+            ["validate_cross_standard_references.py", "--dataset-yaml", str(dataset), *reference_args],
+        ),
+        (
+            "query_cross_standard_references",
+            ["query_cross_standard_references.py", "--dataset-yaml", str(dataset), *query],
+        ),
+        (
+            "query_cross_standard_references_snapshot",
+            ["query_cross_standard_references.py", "--dataset-snapshot", str(snapshot), *query],
+        ),
+        (
+            "generate_cross_standard_reference_views",
+            ["generate_cross_standard_reference_views.py", "--dataset-yaml", str(dataset),
+             "--full-mmd-out", str(out_dir / "xref.mmd"), "--atag-wcag-mmd-out", str(out_dir / "xref.atag-wcag.mmd"),
+             "--informative-mmd-out", str(out_dir / "xref.informative.mmd")],
+        ),
+        (
+            "generate_accessibility_rule_comparison",
+            ["generate_accessibility_rule_comparison.py", "--catalog-yaml", str(inputs["rule_catalogs"]),
+             "--csv-out", str(out_dir / "accessibility-rule-catalogs.comparison.csv")],
+        ),
+        (
+            "generate_standards_link_graph",
+            ["generate_standards_link_graph.py", "--graph-yaml", str(inputs["graph"]),
+             "--jsonld-out", str(out_dir / "standards-link-graph.jsonld"),
+             "--csv-out", str(out_dir / "standards-link-graph.edges.csv"),
+             "--mermaid-out", str(out_dir / "standards-link-graph.mmd")],
+        ),
+        (
+            "generate_standards_visualizations",
+            ["generate_standards_visualizations.py", "--graph-yaml", str(inputs["graph"]),
+             "--html-yaml", str(inputs["html"]), "--css-yaml", str(inputs["css"]),
+             "--by-relation-out", str(out_dir / "graph.by-relation.mmd"), "--wcag-out", str(out_dir / "graph.wcag.mmd"),
+             "--parts-out", str(out_dir / "graph.parts.mmd"), "--parts-csv-out", str(out_dir / "graph.parts.csv")],
+        ),
+        (
+            "generate_wcag_sc_crosswalk_map",
+            ["generate_wcag_sc_crosswalk_map.py", "--crosswalk-yaml", str(inputs["crosswalk"]),
+             "--wcag-yaml", str(inputs["wcag22"]), "--mmd-out", str(out_dir / "wcag-sc-crosswalk.mmd"),
+             "--csv-out", str(out_dir / "wcag-sc-crosswalk.csv")],
+        ),
+        (
+            "validate_standards_graph",
+            ["validate_standards_graph.py", "--graph-yaml", str(inputs["graph"]), "--stale-threshold-days", "100000"],
+        ),
+    ]
+
+
+def wait_child(proc: subprocess.Popen):
+    """Wait for proc; returns (exit code, peak RSS in KB or None)."""
+    if hasattr(os, "wait4"):
+        # os.wait4 reports the peak RSS of this child alone.
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        return proc.returncode, rss_kb(usage.ru_maxrss)
+    proc.wait()
+    if resource is None:
+        return proc.returncode, None
+    # Without wait4 only the largest peak over all children so far is
+    # available, so a script is never reported below an earlier, larger one.
+    return proc.returncode, rss_kb(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+
+
+def rss_kb(max_rss: int) -> int:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    return max_rss // 1024 if sys.platform == "darwin" else max_rss
+
+
+def run_once(args: list[str], timeout: float):
+    with tempfile.TemporaryFile() as stderr:
+        start = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, str(SCRIPTS_DIR / args[0]), *args[1:]],
+            cwd=REPO_ROOT,
+            stdout=subprocess.DEVNULL,
+            stderr=stderr,
+        )
+        timed_out = threading.Event()
+
+        def kill():
+            timed_out.set()
+            proc.kill()
+
+        timer = threading.Timer(timeout, kill)
+        timer.start()
+        try:
+            returncode, max_rss_kb = wait_child(proc)
+        finally:
+            timer.cancel()
+        elapsed = time.perf_counter() - start
+        if timed_out.is_set():
+            return {"status": "timeout", "seconds": round(elapsed, 3)}
+        if returncode != 0:
+            stderr.seek(0)
+            tail = stderr.read().decode("utf-8", errors="replace").strip().splitlines()[-1:]
+            return {"status": "failed", "seconds": round(elapsed, 3), "error": " ".join(tail)}
+    return {"status": "ok", "seconds": round(elapsed, 3), "max_rss_kb": max_rss_kb}
+
+
+def run_benchmark(args: list[str], repeat: int, timeout: float):
+    best = None
+    for _ in range(repeat):
+        result = run_once(args, timeout)
+        if result["status"] != "ok":
+            return result
+        if best is None or result["seconds"] < best["seconds"]:
+            peaks = [value for value in (result["max_rss_kb"], (best or {}).get("max_rss_kb")) if value is not None]
+            best = {**result, "max_rss_kb": max(peaks) if peaks else None}
+    return best
+
+
+def machine_info():
+    return {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def machine_fingerprint() -> str:
+    # Kernel and patch versions are left out so that every runner of one
+    # class (e.g. GitHub's ubuntu-latest) shares a baseline.
+    python = ".".join(platform.python_version_tuple()[:2])
+    return f"{platform.system().lower()}-{platform.machine().lower()}-py{python}-{os.cpu_count()}cpu"
+
+
+# Baseline file: {"baseline_version": 2, "machines": {fingerprint:
+# {"machine": {...}, "recorded_at": ..., "results": {scale: {name: result}}}}}
+def load_baseline(path: Path):
+    if not path.exists():
+        return {"baseline_version": BASELINE_VERSION, "machines": {}}
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(data, dict) or data.get("baseline_version") != BASELINE_VERSION:
+        raise ValueError(f"{path}: unsupported benchmark baseline")
+    return data
+
+
+def compare(result: dict, baseline: dict, threshold: float, min_delta: float):
+    if not baseline:
+        return "no baseline"
+    if baseline.get("status") != "ok":
+        return "improved" if result["status"] == "ok" else "unchanged"
+    if result["status"] != "ok":
+        return "regression"
+    delta = result["seconds"] - baseline["seconds"]
+    if delta > min_delta and result["seconds"] > baseline["seconds"] * (1 + threshold):
+        return "regression"
+    if -delta > min_delta and baseline["seconds"] > result["seconds"] * (1 + threshold):
+        return "improved"
+    return "ok"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the standards artifact scripts on synthetic scaled-up inputs")
+    parser.add_argument(
+        "--scales",
+        default="10",
+        help="Comma-separated multiples of the shipped research inputs (e.g. 10,100,1000)",
+    )
+    parser.add_argument("--source-dir", default=RESEARCH_DIR, help="Directory holding the shipped research YAMLs")
+    parser.add_argument("--work-dir", default="", help="Keep synthetic inputs and outputs here instead of a temp dir")
+    parser.add_argument(
+        "--only",
+        action="append",
+        default=[],
+        help=(
+            "Run only this benchmark (repeatable); generate_cross_standard_references also runs "
+            "when a selected benchmark reads its dataset"
+        ),
+    )
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per benchmark; the fastest is reported")
+    parser.add_argument("--timeout", type=float, default=900, help="Seconds before a run is killed")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="Record this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative slowdown before failing")
+    parser.add_argument("--min-delta", type=float, default=0.5, help="Ignore slowdowns smaller than this many seconds")
+    parser.add_argument("--json-out", default="", help="Optional path for the raw results as JSON")
+    args = parser.parse_args()
+
+    scales = [int(item) for item in args.scales.split(",") if item.strip()]
+    source_dir = REPO_ROOT / args.source_dir
+    baseline_path = REPO_ROOT / args.baseline
+    baseline = load_baseline(baseline_path)
+    fingerprint = machine_fingerprint()
+    machine_baseline = baseline["machines"].get(fingerprint, {})
+    baseline_results = machine_baseline.get("results", {})
+    if not machine_baseline:
+        recorded = ", ".join(sorted(baseline["machines"])) or "none"
+        print(f"warning: no baseline for {fingerprint} (recorded: {recorded})", file=sys.stderr)
+
+    results = {}
+    regressions = []
+    with tempfile.TemporaryDirectory(prefix="standards-bench-") as tmp:
+        work_root = Path(args.work_dir) if args.work_dir else Path(tmp)
+        print("scale\tbenchmark\tseconds\tmax_rss_kb\tbaseline_seconds\tverdict")
+        for scale in scales:
+            work_dir = work_root / f"x{scale}"
+            start = time.perf_counter()
+            inputs = synthesize_inputs(source_dir, work_dir / "inputs", scale)
+            print(f"# x{scale}: synthesized inputs in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+            if str(scale) not in baseline_results:
+                print(f"# x{scale}: no baseline for {fingerprint}", file=sys.stderr)
+
+            scale_results = results.setdefault(str(scale), {})
+            for name, command in build_workloads(inputs, work_dir / "out"):
+                if args.only and name not in args.only:
+                    if name != "generate_cross_standard_references" or not DATASET_WORKLOADS.intersection(args.only):
+                        continue
+                result = run_benchmark(command, args.repeat, args.timeout)
+                scale_results[name] = result
+                previous = baseline_results.get(str(scale), {}).get(name, {})
+                verdict = compare(result, previous, args.threshold, args.min_delta)
+                if verdict == "regression":
+                    regressions.append(f"x{scale} {name}")
+                seconds = f"{result['seconds']:.3f}" if result["status"] == "ok" else result["status"]
+                print(
+                    f"x{scale}\t{name}\t{seconds}\t{result.get('max_rss_kb') or ''}\t"
+                    f"{previous.get('seconds', '') if previous.get('status') == 'ok' else previous.get('status', '')}\t{verdict}"
+                )
+                if result["status"] == "failed":
+                    print(f"# {name}: {result.get('error', '')}", file=sys.stderr)
+
+    report = {
+        "fingerprint": fingerprint,
+        "machine": machine_info(),
+        "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "results": results,
+    }
+    if args.json_out:
+        Path(args.json_out).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    if args.update_baseline:
+        merged = baseline_results
+        for scale, entries in results.items():
+            merged.setdefault(scale, {}).update(entries)
+        baseline["machines"][fingerprint] = {
+            "machine": report["machine"],
+            "recorded_at": report["recorded_at"],
+            "results": dict(sorted(merged.items(), key=lambda item: int(item[0]))),
+        }
+        baseline["machines"] = dict(sorted(baseline["machines"].items()))
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(baseline, indent=2) + "\n", encoding="utf-8")
+        print(f"baseline={args.baseline} machine={fingerprint}")
+        return
+
+    if regressions:
+        print(f"regressions={len(regressions)}")
+        for item in regressions:
+            print(f"REGRESSION: {item}")
+        raise SystemExit(1)
+    print("regressions=0")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,22 @@
 #!/usr/bin/env python3
 import argparse
+import itertools
+import json
+import random
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Iterable
 from urllib.parse import urlparse
-from urllib import error, request
+from urllib import error
+
+from http_pool import ConnectionPool, atomic_write_text
 
 URL_RE = re.compile(r"https?://[^\s<>'\")\]]+")
 DATED_TR_RE = re.compile(r"^https?://www\.w3\.org/TR/\d{4}/")
+USER_AGENT = "wai-yaml-ld-link-check/1.0 (+https://github.com/mgifford/wai-yaml-ld)"
+HEALTH_CACHE_VERSION = 2
 
 
 def expand_inputs(includes: list[str]) -> list[Path]:
@@ -36,29 +45,113 @@ def should_skip_url(url: str) -> bool:
     return host in {"localhost", "127.0.0.1"}
 
 
-def check_url(url: str, timeout: int) -> tuple[bool, str]:
-    headers = {"User-Agent": "wai-yaml-ld-link-check/1.0 (+https://github.com/mgifford/wai-yaml-ld)"}
-    req_head = request.Request(url, method="HEAD", headers=headers)
+def response_validators(headers) -> dict[str, str]:
+    validators = {}
+    if headers.get("ETag"):
+        validators["etag"] = headers["ETag"]
+    if headers.get("Last-Modified"):
+        validators["last_modified"] = headers["Last-Modified"]
+    return validators
+
+
+# Returns (ok, message, validators). Validators from an earlier check make the
+# HEAD request conditional; a 304 answer counts as healthy.
+def check_url(pool: ConnectionPool, url: str, validators: dict | None = None) -> tuple[bool, str, dict]:
+    validators = validators or {}
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
     try:
-        with request.urlopen(req_head, timeout=timeout) as response:
-            code = response.getcode() or 0
+        with pool.open(url, method="HEAD", headers=headers) as response:
+            code = response.status or 0
             if 200 <= code < 400:
-                return True, f"HTTP {code}"
-            return False, f"HTTP {code}"
+                return True, f"HTTP {code}", response_validators(response.headers)
+            return False, f"HTTP {code}", {}
     except error.HTTPError as exc:
+        if exc.code == 304 and headers:
+            return True, "HTTP 304 (not modified)", validators
         if exc.code in (405, 403):
-            req_get = request.Request(url, method="GET", headers=headers)
             try:
-                with request.urlopen(req_get, timeout=timeout) as response:
-                    code = response.getcode() or 0
+                with pool.open(url) as response:
+                    code = response.status or 0
                     if 200 <= code < 400:
-                        return True, f"HTTP {code} (GET fallback)"
-                    return False, f"HTTP {code} (GET fallback)"
+                        return True, f"HTTP {code} (GET fallback)", response_validators(response.headers)
+                    return False, f"HTTP {code} (GET fallback)", {}
             except Exception as get_exc:
-                return False, f"{type(get_exc).__name__}: {get_exc}"
-        return False, f"HTTPError {exc.code}"
+                return False, f"{type(get_exc).__name__}: {get_exc}", {}
+        return False, f"HTTPError {exc.code}", {}
     except Exception as exc:
-        return False, f"{type(exc).__name__}: {exc}"
+        return False, f"{type(exc).__name__}: {exc}", {}
+
+
+def host_of(url: str) -> str:
+    return (urlparse(url).hostname or "").lower()
+
+
+# Round-robin over hosts so that workers waiting on one busy host's slots do
+# not hold up URLs on other hosts.
+def interleave_by_host(urls: list[str]) -> list[str]:
+    by_host: dict[str, list[str]] = {}
+    for url in urls:
+        by_host.setdefault(host_of(url), []).append(url)
+    return [url for group in itertools.zip_longest(*by_host.values()) for url in group if url is not None]
+
+
+def check_urls(
+    urls: list[str],
+    timeout: int,
+    concurrency: int,
+    per_host: int,
+    validators: dict[str, dict] | None = None,
+) -> dict[str, tuple[bool, str, dict]]:
+    validators = validators or {}
+    pool = ConnectionPool(
+        timeout=timeout,
+        headers={"User-Agent": USER_AGENT},
+        max_idle_per_host=per_host,
+        max_per_host=per_host,
+    )
+    ordered = interleave_by_host(urls)
+    with pool, ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        return dict(zip(ordered, executor.map(lambda url: check_url(pool, url, validators.get(url)), ordered)))
+
+
+# URL health cache: url -> {"ok", "message", "checked_at", "jitter", "etag",
+# "last_modified"}. Only healthy results are kept; broken URLs are probed
+# again on every run. Expiry is computed from the current TTL when the cache
+# is read, so changing --cache-ttl-hours applies to existing entries too.
+def load_health_cache(path: Path) -> dict[str, dict]:
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != HEALTH_CACHE_VERSION:
+        return {}
+    return data.get("urls", {})
+
+
+def write_health_cache(path: Path, entries: dict[str, dict]) -> None:
+    payload = {"version": HEALTH_CACHE_VERSION, "urls": dict(sorted(entries.items()))}
+    atomic_write_text(path, json.dumps(payload, indent=1) + "\n")
+
+
+# Each healthy result expires after the TTL shortened by a random share of
+# up to `jitter`, so URLs first checked together are rechecked on different
+# days instead of all expiring at once. The entry keeps its random draw in
+# [0, 1) as "jitter".
+def health_expiry(entry: dict, ttl_seconds: float, jitter: float) -> float:
+    return entry.get("checked_at", 0) + ttl_seconds * (1 - jitter * entry.get("jitter", 0))
+
+
+def jitter_fraction(value: str) -> float:
+    fraction = float(value)
+    if not 0 <= fraction < 1:
+        raise argparse.ArgumentTypeError("must be at least 0 and less than 1")
+    return fraction
 
 
 def write_report(
@@ -66,6 +159,7 @@ def write_report(
     checked_urls: Iterable[str],
     broken: list[tuple[str, str]],
     dated_tr_urls: list[str],
+    cache_stats: tuple[int, int] | None = None,
 ) -> None:
     report_path.parent.mkdir(parents=True, exist_ok=True)
     lines: list[str] = []
@@ -74,6 +168,10 @@ def write_report(
     lines.append(f"- URLs checked: {len(list(checked_urls))}")
     lines.append(f"- Broken URLs: {len(broken)}")
     lines.append(f"- Dated W3C TR URLs detected: {len(dated_tr_urls)}")
+    if cache_stats is not None:
+        hits, total = cache_stats
+        rate = 100.0 * hits / total if total else 0.0
+        lines.append(f"- Health cache hits: {hits}/{total} ({rate:.1f}%), probed: {total - hits}")
     lines.append("")
 
     if broken:
@@ -112,11 +210,40 @@ def main() -> None:
         default=20,
         help="Per-request timeout in seconds",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=16,
+        help="Maximum number of URLs checked at once",
+    )
+    parser.add_argument(
+        "--per-host",
+        type=int,
+        default=4,
+        help="Maximum number of concurrent requests to one host",
+    )
     parser.add_argument(
         "--report",
         default="monitoring/resource-link-report.md",
         help="Path to markdown report output",
     )
+    parser.add_argument(
+        "--cache",
+        default="",
+        help="Path to a JSON URL health cache; healthy URLs are not probed again until their entry expires",
+    )
+    parser.add_argument(
+        "--cache-ttl-hours",
+        type=float,
+        default=168,
+        help="How long a healthy result is reused",
+    )
+    parser.add_argument(
+        "--cache-jitter",
+        type=jitter_fraction,
+        default=0.5,
+        help="Random share (0 <= jitter < 1) of the TTL subtracted per entry to spread rechecks over several runs",
+    )
     args = parser.parse_args()
 
     includes = args.include or [
@@ -135,19 +262,61 @@ def main() -> None:
         text = file_path.read_text(encoding="utf-8", errors="replace")
         all_urls.update(extract_urls(text))
 
+    to_check = [url for url in sorted(all_urls) if not should_skip_url(url)]
+
+    now = time.time()
+    ttl_seconds = args.cache_ttl_hours * 3600
+    cache_path = Path(args.cache) if args.cache else None
+    cached = load_health_cache(cache_path) if cache_path else {}
+    fresh = {
+        url: cached[url]
+        for url in to_check
+        if url in cached
+        and cached[url].get("ok")
+        and cached[url].get("checked_at", 0) <= now
+        and health_expiry(cached[url], ttl_seconds, args.cache_jitter) > now
+    }
+    to_probe = [url for url in to_check if url not in fresh]
+    results = check_urls(
+        to_probe,
+        args.timeout_seconds,
+        args.concurrency,
+        args.per_host,
+        {url: cached[url] for url in to_probe if url in cached},
+    )
+
     broken: list[tuple[str, str]] = []
     dated_tr_urls: list[str] = []
-    for url in sorted(all_urls):
-        if should_skip_url(url):
-            continue
-        ok, message = check_url(url, timeout=args.timeout_seconds)
+    for url in to_check:
+        if url in fresh:
+            ok, message = True, fresh[url].get("message", "")
+        else:
+            ok, message, _ = results[url]
         if not ok:
             broken.append((url, message))
         if DATED_TR_RE.match(url):
             dated_tr_urls.append(url)
 
+    cache_stats = None
+    if cache_path:
+        rng = random.Random()
+        entries = dict(fresh)
+        for url in to_probe:
+            ok, message, validators = results[url]
+            if ok:
+                entries[url] = {
+                    "ok": True,
+                    "message": message,
+                    "checked_at": int(now),
+                    "jitter": round(rng.random(), 4),
+                    **validators,
+                }
+        write_health_cache(cache_path, entries)
+        cache_stats = (len(fresh), len(to_check))
+        print(f"cache: {len(fresh)}/{len(to_check)} hits, probed {len(to_probe)}")
+
     report_path = Path(args.report)
-    write_report(report_path, all_urls, broken, dated_tr_urls)
+    write_report(report_path, all_urls, broken, dated_tr_urls, cache_stats)
 
     if broken or dated_tr_urls:
         for url, message in broken:
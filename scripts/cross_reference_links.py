@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Shared record type for cross-standard reference links.
+
+Every link carries the same fixed set of string fields, so links are held as
+slotted objects with interned values instead of per-link dicts. Values such
+as standard ids, relation types and URLs repeat across thousands of links and
+are stored once.
+"""
+import sys
+from operator import attrgetter
+
+# Column order of the CSV and snapshot outputs.
+LINK_FIELDNAMES = [
+    "link_id",
+    "relation_type",
+    "basis",
+    "confidence",
+    "source_kind",
+    "source_standard_id",
+    "source_criterion_id",
+    "source_criterion_code",
+    "source_criterion_title",
+    "source_resource_id",
+    "source_url",
+    "target_standard_id",
+    "target_criterion_code",
+    "target_profile_ref",
+    "target_url",
+    "evidence_excerpt",
+    "source_dataset",
+]
+
+DEDUPE_FIELDS = [
+    "relation_type",
+    "source_kind",
+    "source_standard_id",
+    "source_criterion_code",
+    "source_resource_id",
+    "target_standard_id",
+    "target_criterion_code",
+    "target_profile_ref",
+]
+
+RESOURCE_SOURCE_KIND = "informative_resource"
+
+# Key order of a link in the YAML dataset: source_resource_id follows the
+# title for informative resources and is appended after link_id otherwise.
+_COMMON_ORDER = [name for name in LINK_FIELDNAMES if name not in ("link_id", "source_resource_id")]
+_TITLE_POSITION = _COMMON_ORDER.index("source_criterion_title") + 1
+_RESOURCE_ORDER = (
+    _COMMON_ORDER[:_TITLE_POSITION] + ["source_resource_id"] + _COMMON_ORDER[_TITLE_POSITION:] + ["link_id"]
+)
+_CRITERION_ORDER = _COMMON_ORDER + ["link_id", "source_resource_id"]
+_RESOURCE_VALUES = attrgetter(*_RESOURCE_ORDER)
+_CRITERION_VALUES = attrgetter(*_CRITERION_ORDER)
+_DEDUPE_KEY = attrgetter(*DEDUPE_FIELDS)
+
+
+def _field_value(value) -> str:
+    if value is None:
+        return ""
+    return sys.intern(value if type(value) is str else str(value))
+
+
+class Link:
+    __slots__ = tuple(LINK_FIELDNAMES)
+
+    def __init__(self, **fields):
+        unknown = set(fields) - set(LINK_FIELDNAMES)
+        if unknown:
+            raise TypeError(f"unknown link fields: {', '.join(sorted(unknown))}")
+        for name in LINK_FIELDNAMES:
+            setattr(self, name, _field_value(fields.get(name)))
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        link = cls.__new__(cls)
+        for name in LINK_FIELDNAMES:
+            setattr(link, name, _field_value(data.get(name)))
+        return link
+
+    def dedupe_key(self) -> tuple:
+        return _DEDUPE_KEY(self)
+
+    def to_dict(self) -> dict:
+        if self.source_kind == RESOURCE_SOURCE_KIND:
+            return dict(zip(_RESOURCE_ORDER, _RESOURCE_VALUES(self)))
+        return dict(zip(_CRITERION_ORDER, _CRITERION_VALUES(self)))
+
+    def __repr__(self):
+        return f"Link(link_id={self.link_id!r}, relation_type={self.relation_type!r})"
+
+
+def links_from_records(records) -> list[Link]:
+    return [Link.from_dict(item) for item in records]
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""Columnar binary snapshot of the cross-standard references links.
+
+Layout (all integers little-endian uint32, every section 4-byte aligned):
+
+    magic "XREFSNAP" | version | row_count | column_count
+    per column:
+        name_length | name bytes (padded)
+        dictionary_count | dictionary_blob_length
+        dictionary offsets (dictionary_count + 1) | dictionary blob (padded)
+        codes (row_count)
+
+Each column is dictionary-encoded: the codes array holds, for every link,
+the index of its value in the column dictionary. Readers mmap the file and
+expose the codes arrays as memoryviews without copying them.
+"""
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+from cross_reference_links import Link
+from http_pool import atomic_open
+
+SNAPSHOT_MAGIC = b"XREFSNAP"
+SNAPSHOT_VERSION = 1
+HEADER_SIZE = 20
+
+_U32 = struct.Struct("<I")
+
+
+def _pad(length: int) -> int:
+    return (4 - length % 4) % 4
+
+
+def _u32_array(values) -> bytes:
+    data = array("I", values)
+    if sys.byteorder != "little":
+        data.byteswap()
+    return data.tobytes()
+
+
+class SnapshotWriter:
+    """Dictionary-encode links one at a time and write the snapshot at the end."""
+
+    def __init__(self, fieldnames: list[str]):
+        self.fieldnames = list(fieldnames)
+        self.row_count = 0
+        self._dictionaries = {name: {} for name in self.fieldnames}
+        self._codes = {name: array("I") for name in self.fieldnames}
+
+    def add(self, link: dict):
+        for name in self.fieldnames:
+            value = str(link.get(name, "") or "")
+            lookup = self._dictionaries[name]
+            code = lookup.get(value)
+            if code is None:
+                code = lookup[value] = len(lookup)
+            self._codes[name].append(code)
+        self.row_count += 1
+
+    def write(self, path: Path):
+        with atomic_open(path, "wb") as fp:
+            fp.write(SNAPSHOT_MAGIC)
+            fp.write(_u32_array([SNAPSHOT_VERSION, self.row_count, len(self.fieldnames)]))
+            for name in self.fieldnames:
+                encoded_name = name.encode("utf-8")
+                fp.write(_U32.pack(len(encoded_name)))
+                fp.write(encoded_name + b"\0" * _pad(len(encoded_name)))
+
+                values = [value.encode("utf-8") for value in self._dictionaries[name]]
+                offsets = [0]
+                for value in values:
+                    offsets.append(offsets[-1] + len(value))
+                blob = b"".join(values)
+                fp.write(_u32_array([len(values), len(blob)]))
+                fp.write(_u32_array(offsets))
+                fp.write(blob + b"\0" * _pad(len(blob)))
+
+                column_codes = array("I", self._codes[name])
+                if sys.byteorder != "little":
+                    column_codes.byteswap()
+                fp.write(column_codes.tobytes())
+        return self.row_count
+
+
+def write_snapshot(path: Path, links, fieldnames: list[str]):
+    writer = SnapshotWriter(fieldnames)
+    for link in links:
+        writer.add(link)
+    return writer.write(path)
+
+
+class Snapshot:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._mmap = None
+        self.columns = []
+        self._layout = {}
+        self._dictionaries = {}
+        self._checked_codes = set()
+        with self.path.open("rb") as fp:
+            size = os.fstat(fp.fileno()).st_size
+            if size < HEADER_SIZE:
+                raise ValueError(f"{self.path} is not a cross-reference snapshot")
+            self._mmap = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        try:
+            self._read_layout(size)
+        except ValueError:
+            self.close()
+            raise
+
+    def _read_layout(self, size: int):
+        if bytes(self._view[:8]) != SNAPSHOT_MAGIC:
+            raise ValueError(f"{self.path} is not a cross-reference snapshot")
+        version, self.row_count, column_count = struct.unpack_from("<III", self._view, 8)
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"{self.path}: unsupported snapshot version {version}")
+
+        def require(end: int):
+            if end > size:
+                raise ValueError(f"{self.path} is truncated: column {len(self.columns)} needs {end} bytes, file has {size}")
+
+        pos = HEADER_SIZE
+        for _ in range(column_count):
+            require(pos + 4)
+            (name_length,) = _U32.unpack_from(self._view, pos)
+            pos += 4
+            require(pos + name_length + _pad(name_length) + 8)
+            try:
+                name = bytes(self._view[pos : pos + name_length]).decode("utf-8")
+            except UnicodeDecodeError:
+                raise ValueError(f"{self.path}: column {len(self.columns)} has an invalid name") from None
+            pos += name_length + _pad(name_length)
+            dictionary_count, blob_length = struct.unpack_from("<II", self._view, pos)
+            pos += 8
+            offsets_pos = pos
+            pos += 4 * (dictionary_count + 1)
+            blob_pos = pos
+            pos += blob_length + _pad(blob_length)
+            codes_pos = pos
+            pos += 4 * self.row_count
+            require(pos)
+            self.columns.append(name)
+            self._layout[name] = (dictionary_count, offsets_pos, blob_pos, codes_pos, blob_length)
+
+    def __len__(self):
+        return self.row_count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._mmap is None:
+            return
+        self._dictionaries.clear()
+        self._checked_codes.clear()
+        self._layout.clear()
+        self._view.release()
+        self._mmap.close()
+        self._mmap = None
+
+    def _u32_view(self, start: int, count: int):
+        raw = self._view[start : start + 4 * count]
+        if sys.byteorder == "little":
+            return raw.cast("I")
+        data = array("I", raw)
+        data.byteswap()
+        return memoryview(data)
+
+    def codes(self, name: str):
+        dictionary_count, _, _, codes_pos, _ = self._layout[name]
+        codes = self._u32_view(codes_pos, self.row_count)
+        if name not in self._checked_codes:
+            if self.row_count and max(codes) >= dictionary_count:
+                raise ValueError(f"{self.path}: column {name} has codes outside its dictionary")
+            self._checked_codes.add(name)
+        return codes
+
+    def dictionary(self, name: str) -> list[str]:
+        cached = self._dictionaries.get(name)
+        if cached is not None:
+            return cached
+        dictionary_count, offsets_pos, blob_pos, _, blob_length = self._layout[name]
+        offsets = self._u32_view(offsets_pos, dictionary_count + 1)
+        if any(offsets[i] > offsets[i + 1] for i in range(dictionary_count)) or offsets[dictionary_count] > blob_length:
+            raise ValueError(f"{self.path}: column {name} has invalid dictionary offsets")
+        values = [
+            str(self._view[blob_pos + offsets[i] : blob_pos + offsets[i + 1]], "utf-8")
+            for i in range(dictionary_count)
+        ]
+        self._dictionaries[name] = values
+        return values
+
+    def value(self, name: str, code: int) -> str:
+        """Decode one dictionary entry of a column without decoding the rest."""
+        dictionary_count, offsets_pos, blob_pos, _, blob_length = self._layout[name]
+        if code >= dictionary_count:
+            raise ValueError(f"{self.path}: column {name} has codes outside its dictionary")
+        start, end = struct.unpack_from("<II", self._view, offsets_pos + 4 * code)
+        if not start <= end <= blob_length:
+            raise ValueError(f"{self.path}: column {name} has invalid dictionary offsets")
+        return str(self._view[blob_pos + start : blob_pos + end], "utf-8")
+
+    def row(self, index: int) -> dict:
+        return next(self.rows_at((index,)))
+
+    def rows_at(self, positions):
+        """Yield the rows at positions, decoding only the values they use.
+
+        Column views are fetched once; each dictionary entry is decoded at
+        most once per call.
+        """
+        columns = [(name, self._u32_view(self._layout[name][3], self.row_count), {}) for name in self.columns]
+        for index in positions:
+            row = {}
+            for name, codes, decoded in columns:
+                code = codes[index]
+                value = decoded.get(code)
+                if value is None:
+                    value = decoded[code] = self.value(name, code)
+                row[name] = value
+            yield row
+
+    def rows(self):
+        columns = [(name, self.dictionary(name), self.codes(name)) for name in self.columns]
+        for index in range(self.row_count):
+            yield {name: values[codes[index]] for name, values, codes in columns}
+
+
+def load_snapshot_links(path: Path):
+    with Snapshot(path) as snapshot:
+        return [Link.from_dict(row) for row in snapshot.rows()]
@@ -1,12 +1,19 @@
 #!/usr/bin/env python3
 import argparse
 import csv
+import hashlib
 import itertools
+import json
+import random
 import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import yaml
 
+from http_pool import atomic_write_text
+
 
 STOPWORDS = {
     "and", "the", "with", "from", "into", "must", "has", "have", "for", "are",
@@ -15,6 +22,17 @@ STOPWORDS = {
     "html", "page", "rule", "rules", "style", "code", "accessible", "name"
 }
 
+MIN_SHARED_TOKENS = 2
+SCORE_THRESHOLD = 0.34
+
+ENGINES = ["exact", "minhash", "sparse"]
+LSH_BANDS = 32
+LSH_ROWS = 2
+MINHASH_SEED = 1
+MERSENNE_PRIME = (1 << 61) - 1
+SHARD_RULES = 1000
+CACHE_VERSION = 1
+
 
 def load_catalog(path: Path):
     data = yaml.safe_load(path.read_text())
@@ -28,14 +46,16 @@ def tokenize(text: str):
     return {tok for tok in normalized.split() if len(tok) >= 3 and tok not in STOPWORDS and not tok.isdigit()}
 
 
-def score_rules(left, right):
-    left_tokens = tokenize(left.get("title") or left.get("id"))
-    right_tokens = tokenize(right.get("title") or right.get("id"))
+def rule_tokens(rule):
+    return tokenize(rule.get("title") or rule.get("id"))
+
+
+def score_tokens(left_tokens, right_tokens):
     if not left_tokens or not right_tokens:
         return 0.0, []
 
     shared = sorted(left_tokens & right_tokens)
-    if len(shared) < 2:
+    if len(shared) < MIN_SHARED_TOKENS:
         return 0.0, shared
 
     union = left_tokens | right_tokens
@@ -43,41 +63,365 @@ def score_rules(left, right):
     return round(score, 4), shared
 
 
-def build_rows(catalog):
-    rows = []
+def score_rules(left, right):
+    return score_tokens(rule_tokens(left), rule_tokens(right))
+
+
+def build_token_index(token_sets):
+    index = {}
+    for position, tokens in enumerate(token_sets):
+        for token in tokens:
+            index.setdefault(token, []).append(position)
+    return index
+
+
+# Only pairs sharing MIN_SHARED_TOKENS can score above zero, so candidates
+# come from the right set's inverted index. They are yielded in the order of
+# the full nested loop because the final sort is stable.
+def candidate_pairs(left_token_sets, right_index, start: int = 0, stop: int | None = None):
+    for left_position in range(start, len(left_token_sets) if stop is None else stop):
+        tokens = left_token_sets[left_position]
+        counts = {}
+        for token in tokens:
+            for right_position in right_index.get(token, ()):
+                counts[right_position] = counts.get(right_position, 0) + 1
+        for right_position in sorted(position for position, count in counts.items() if count >= MIN_SHARED_TOKENS):
+            yield left_position, right_position
+
+
+def indexed_pair_candidates(token_sets):
+    indexes = [build_token_index(tokens) for tokens in token_sets]
+
+    def candidates(left_number: int, right_number: int, start: int = 0, stop: int | None = None):
+        return candidate_pairs(token_sets[left_number], indexes[right_number], start, stop)
+
+    return candidates
+
+
+def token_hash(token: str) -> int:
+    # Stable across runs, unlike hash() under hash randomisation.
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class MinHasher:
+    def __init__(self, permutations: int, seed: int = MINHASH_SEED):
+        rng = random.Random(seed)
+        self.coefficients = [
+            (rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME)) for _ in range(permutations)
+        ]
+        self._token_values = {}
+
+    def token_values(self, token: str):
+        values = self._token_values.get(token)
+        if values is None:
+            base = token_hash(token)
+            values = self._token_values[token] = [(a * base + b) % MERSENNE_PRIME for a, b in self.coefficients]
+        return values
+
+    def signature(self, tokens) -> tuple:
+        return tuple(map(min, zip(*(self.token_values(token) for token in tokens))))
+
+
+def lsh_buckets(signatures, bands: int, rows: int):
+    buckets = [{} for _ in range(bands)]
+    for position, signature in enumerate(signatures):
+        if signature is None:
+            continue
+        for band in range(bands):
+            buckets[band].setdefault(signature[band * rows : (band + 1) * rows], []).append(position)
+    return buckets
+
+
+# Approximate candidates: rules whose MinHash signatures agree on every row
+# of at least one band. Candidates are still scored exactly, so the result is
+# a subset of the exact rows; --report-recall measures how much is missed.
+def minhash_pair_candidates(token_sets, bands: int = LSH_BANDS, rows: int = LSH_ROWS):
+    hasher = MinHasher(bands * rows)
+    signatures = [[hasher.signature(tokens) if tokens else None for tokens in rule_tokens_list] for rule_tokens_list in token_sets]
+    buckets = [lsh_buckets(rule_signatures, bands, rows) for rule_signatures in signatures]
+
+    def candidates(left_number: int, right_number: int, start: int = 0, stop: int | None = None):
+        right_buckets = buckets[right_number]
+        left_signatures = signatures[left_number]
+        for left_position in range(start, len(left_signatures) if stop is None else stop):
+            signature = left_signatures[left_position]
+            if signature is None:
+                continue
+            found = set()
+            for band in range(bands):
+                found.update(right_buckets[band].get(signature[band * rows : (band + 1) * rows], ()))
+            yield from ((left_position, right_position) for right_position in sorted(found))
+
+    return candidates
+
+
+def require_sparse():
+    # Optional dependency: only the sparse engine needs numpy and scipy.
+    try:
+        import numpy as np
+        from scipy import sparse
+    except ImportError as exc:
+        raise SystemExit("--engine sparse requires numpy and scipy (pip install numpy scipy)") from exc
+    return np, sparse
+
+
+def sparse_pair_candidates(token_sets):
+    np, sparse = require_sparse()
+
+    vocabulary = {}
+    layouts = []
+    for rule_tokens_list in token_sets:
+        indptr = [0]
+        indices = []
+        for tokens in rule_tokens_list:
+            indices.extend(vocabulary.setdefault(token, len(vocabulary)) for token in sorted(tokens))
+            indptr.append(len(indices))
+        layouts.append((indices, indptr))
+
+    matrices = []
+    sizes = []
+    for indices, indptr in layouts:
+        matrix = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.int32), np.array(indices, dtype=np.int64), np.array(indptr, dtype=np.int64)),
+            shape=(len(indptr) - 1, len(vocabulary)),
+        )
+        matrices.append(matrix)
+        sizes.append(np.diff(matrix.indptr))
+
+    # One sparse product gives the shared-token count of every rule pair of
+    # two sets; Jaccard follows from the row sums. The filter leaves a little
+    # slack below the threshold because scores are rounded before comparing,
+    # and build_rows rescores the survivors exactly.
+    def candidates(left_number: int, right_number: int, start: int = 0, stop: int | None = None):
+        shared = (matrices[left_number][start:stop] @ matrices[right_number].T).tocoo()
+        counts = shared.data
+        rows = shared.row + start
+        union = sizes[left_number][rows] + sizes[right_number][shared.col] - counts
+        keep = (counts >= MIN_SHARED_TOKENS) & (counts >= (SCORE_THRESHOLD - 1e-4) * union)
+        left_positions = rows[keep]
+        right_positions = shared.col[keep]
+        order = np.lexsort((right_positions, left_positions))
+        return zip(left_positions[order].tolist(), right_positions[order].tolist())
+
+    return candidates
+
+
+def prepare_comparison(catalog, engine: str, lsh_bands: int, lsh_rows: int):
     rule_sets = catalog.get("rule_sets", [])
+    token_sets = [[rule_tokens(rule) for rule in rule_set.get("rules", [])] for rule_set in rule_sets]
+    if engine == "minhash":
+        pair_candidates = minhash_pair_candidates(token_sets, lsh_bands, lsh_rows)
+    elif engine == "sparse":
+        pair_candidates = sparse_pair_candidates(token_sets)
+    else:
+        pair_candidates = indexed_pair_candidates(token_sets)
+    return rule_sets, token_sets, pair_candidates
 
-    for left_set, right_set in itertools.combinations(rule_sets, 2):
-        left_provider = left_set.get("provider", left_set.get("id", ""))
-        right_provider = right_set.get("provider", right_set.get("id", ""))
-
-        for left_rule in left_set.get("rules", []):
-            for right_rule in right_set.get("rules", []):
-                score, shared = score_rules(left_rule, right_rule)
-                if score < 0.34:
-                    continue
-
-                rows.append(
-                    {
-                        "left_provider": left_provider,
-                        "left_rule_set": left_set.get("id", ""),
-                        "left_rule_id": left_rule.get("id", ""),
-                        "left_rule_title": left_rule.get("title", ""),
-                        "left_rule_url": left_rule.get("url", ""),
-                        "right_provider": right_provider,
-                        "right_rule_set": right_set.get("id", ""),
-                        "right_rule_id": right_rule.get("id", ""),
-                        "right_rule_title": right_rule.get("title", ""),
-                        "right_rule_url": right_rule.get("url", ""),
-                        "score": score,
-                        "shared_tokens": "|".join(shared),
-                    }
-                )
 
-    rows.sort(key=lambda item: (-float(item["score"]), item["left_rule_id"], item["right_rule_id"]))
+def comparison_row(left_set, right_set, left_rule, right_rule, score: float, shared):
+    return {
+        "left_provider": left_set.get("provider", left_set.get("id", "")),
+        "left_rule_set": left_set.get("id", ""),
+        "left_rule_id": left_rule.get("id", ""),
+        "left_rule_title": left_rule.get("title", ""),
+        "left_rule_url": left_rule.get("url", ""),
+        "right_provider": right_set.get("provider", right_set.get("id", "")),
+        "right_rule_set": right_set.get("id", ""),
+        "right_rule_id": right_rule.get("id", ""),
+        "right_rule_title": right_rule.get("title", ""),
+        "right_rule_url": right_rule.get("url", ""),
+        "score": score,
+        "shared_tokens": "|".join(shared),
+    }
+
+
+def compare_rule_sets(context, left_number: int, right_number: int, start: int = 0, stop: int | None = None):
+    rule_sets, token_sets, pair_candidates = context
+    rows = []
+    left_set = rule_sets[left_number]
+    right_set = rule_sets[right_number]
+    left_rules = left_set.get("rules", [])
+    right_rules = right_set.get("rules", [])
+
+    for left_position, right_position in pair_candidates(left_number, right_number, start, stop):
+        left_rule = left_rules[left_position]
+        right_rule = right_rules[right_position]
+        score, shared = score_tokens(token_sets[left_number][left_position], token_sets[right_number][right_position])
+        if score < SCORE_THRESHOLD:
+            continue
+        rows.append(comparison_row(left_set, right_set, left_rule, right_rule, score, shared))
     return rows
 
 
+# A shard is a rule-set pair, or a slice of the left set's rules for large
+# pairs. Shards are listed in the sequential comparison order.
+def comparison_shards(rule_sets, shard_rules: int = SHARD_RULES):
+    for left_number, right_number in itertools.combinations(range(len(rule_sets)), 2):
+        count = len(rule_sets[left_number].get("rules", []))
+        for start in range(0, count, shard_rules):
+            yield left_number, right_number, start, min(start + shard_rules, count)
+
+
+_worker_context = None
+
+
+def _init_worker(catalog, engine: str, lsh_bands: int, lsh_rows: int):
+    global _worker_context
+    _worker_context = prepare_comparison(catalog, engine, lsh_bands, lsh_rows)
+
+
+def _compare_shard(shard):
+    return compare_rule_sets(_worker_context, *shard)
+
+
+def build_rows(catalog, engine: str = "exact", lsh_bands: int = LSH_BANDS, lsh_rows: int = LSH_ROWS, workers: int = 1):
+    if workers > 1:
+        if engine == "sparse":
+            require_sparse()
+        shards = list(comparison_shards(catalog.get("rule_sets", []), SHARD_RULES))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(catalog, engine, lsh_bands, lsh_rows),
+        ) as executor:
+            # map() keeps shard order, so the merged rows match a sequential run.
+            rows = [row for shard_rows in executor.map(_compare_shard, shards) for row in shard_rows]
+    else:
+        context = prepare_comparison(catalog, engine, lsh_bands, lsh_rows)
+        rows = []
+        for left_number, right_number in itertools.combinations(range(len(context[0])), 2):
+            rows.extend(compare_rule_sets(context, left_number, right_number))
+
+    sort_rows(rows)
+    return rows
+
+
+def sort_rows(rows):
+    rows.sort(key=lambda item: (-float(item["score"]), item["left_rule_id"], item["right_rule_id"]))
+
+
+def rule_hash(rule_set, rule) -> str:
+    # The rule set id is part of the key: two known rules were compared in the
+    # previous run exactly when they came from different rule sets.
+    key = json.dumps([rule_set.get("id", ""), rule.get("id", ""), rule.get("title", "")], ensure_ascii=False)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:24]
+
+
+def pair_key(left_hash: str, right_hash: str) -> str:
+    # Scores are symmetric, so the key does not depend on which side is left.
+    return "|".join(sorted((left_hash, right_hash)))
+
+
+def cache_config() -> dict:
+    return {
+        "stopwords": sorted(STOPWORDS),
+        "min_shared_tokens": MIN_SHARED_TOKENS,
+        "score_threshold": SCORE_THRESHOLD,
+    }
+
+
+def load_cache(path: Path):
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("cache_version") != CACHE_VERSION or data.get("config") != cache_config():
+        return {}
+    return data
+
+
+def write_cache(path: Path, cache: dict):
+    atomic_write_text(path, json.dumps(cache, ensure_ascii=False, separators=(",", ":")))
+
+
+# Exact comparison that only scores pairs involving a rule missing from the
+# cache; pairs of two cached rules reuse the cached above-threshold results
+# (a cached pair that is absent scored below the threshold last time).
+def build_rows_incremental(catalog, cache: dict):
+    rule_sets = catalog.get("rule_sets", [])
+    token_sets = [[rule_tokens(rule) for rule in rule_set.get("rules", [])] for rule_set in rule_sets]
+    hashes = [[rule_hash(rule_set, rule) for rule in rule_set.get("rules", [])] for rule_set in rule_sets]
+    known = set(cache.get("rules", []))
+    cached_partners = {}
+    for key, result in cache.get("pairs", {}).items():
+        first, second = key.split("|")
+        cached_partners.setdefault(first, []).append((second, result))
+        if second != first:
+            cached_partners.setdefault(second, []).append((first, result))
+    indexes = [build_token_index(tokens) for tokens in token_sets]
+
+    rows = []
+    pairs = {}
+    rescored = 0
+    for left_number, right_number in itertools.combinations(range(len(rule_sets)), 2):
+        left_set = rule_sets[left_number]
+        right_set = rule_sets[right_number]
+        left_tokens = token_sets[left_number]
+        right_tokens = token_sets[right_number]
+        left_hashes = hashes[left_number]
+        right_hashes = hashes[right_number]
+
+        new_right = [position for position, value in enumerate(right_hashes) if value not in known]
+        new_right_index = build_token_index(right_tokens[position] for position in new_right)
+        right_positions_by_hash = {}
+        for position, value in enumerate(right_hashes):
+            right_positions_by_hash.setdefault(value, []).append(position)
+
+        found = []
+        for left_position, left_hash in enumerate(left_hashes):
+            if left_hash in known:
+                # New right rules are scored; cached right rules come from the cache.
+                candidates = [
+                    new_right[position]
+                    for _, position in candidate_pairs([left_tokens[left_position]], new_right_index)
+                ]
+                for right_hash, result in cached_partners.get(left_hash, ()):
+                    for right_position in right_positions_by_hash.get(right_hash, ()):
+                        found.append((left_position, right_position, result[0], result[1]))
+            else:
+                candidates = [
+                    right_position
+                    for _, right_position in candidate_pairs([left_tokens[left_position]], indexes[right_number])
+                ]
+            for right_position in candidates:
+                rescored += 1
+                score, shared = score_tokens(left_tokens[left_position], right_tokens[right_position])
+                if score >= SCORE_THRESHOLD:
+                    found.append((left_position, right_position, score, shared))
+
+        # Same per-pair order as the sequential engines, for the stable sort.
+        found.sort(key=lambda item: (item[0], item[1]))
+        left_rules = left_set.get("rules", [])
+        right_rules = right_set.get("rules", [])
+        for left_position, right_position, score, shared in found:
+            rows.append(
+                comparison_row(left_set, right_set, left_rules[left_position], right_rules[right_position], score, shared)
+            )
+            pairs[pair_key(left_hashes[left_position], right_hashes[right_position])] = [score, list(shared)]
+
+    sort_rows(rows)
+    new_cache = {
+        "cache_version": CACHE_VERSION,
+        "config": cache_config(),
+        "rules": sorted({value for set_hashes in hashes for value in set_hashes}),
+        "pairs": pairs,
+    }
+    return rows, new_cache, rescored
+
+
+def row_key(row) -> tuple:
+    return (row["left_rule_set"], row["left_rule_id"], row["right_rule_set"], row["right_rule_id"])
+
+
+def recall(rows, exact_rows):
+    found = Counter(map(row_key, rows))
+    expected = Counter(map(row_key, exact_rows))
+    matched = sum((found & expected).values())
+    return matched, sum(expected.values())
+
+
 def write_csv(path: Path, rows):
     path.parent.mkdir(parents=True, exist_ok=True)
     fields = [
@@ -110,14 +454,56 @@ def main():
         "--csv-out",
         default="kitty-specs/001-wai-standards-yaml-ld-ingestion/research/derived/accessibility-rule-catalogs.comparison.csv",
     )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="exact",
+        help=(
+            "exact scores every pair sharing two tokens; sparse computes all overlaps with a "
+            "scipy sparse matrix product; minhash finds candidates with MinHash LSH"
+        ),
+    )
+    parser.add_argument("--lsh-bands", type=int, default=LSH_BANDS, help="LSH bands for --engine minhash")
+    parser.add_argument("--lsh-rows", type=int, default=LSH_ROWS, help="MinHash values per LSH band")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Compare rule-set pairs (split into chunks of large sets) in this many processes",
+    )
+    parser.add_argument(
+        "--cache",
+        default="",
+        help="Pair-score cache (JSON); only pairs involving new or changed rules are rescored (exact engine, one process)",
+    )
+    parser.add_argument(
+        "--report-recall",
+        action="store_true",
+        help="Also run the exact engine and report the share of its rows found",
+    )
     args = parser.parse_args()
 
+    if args.cache and args.engine != "exact":
+        parser.error(f"--cache scores new rules with the exact engine and cannot be combined with --engine {args.engine}")
+    if args.cache and args.workers != 1:
+        parser.error("--cache scores new rules in a single process and cannot be combined with --workers")
+
     catalog = load_catalog(Path(args.catalog_yaml))
-    rows = build_rows(catalog)
+    if args.cache:
+        cache_path = Path(args.cache)
+        rows, cache, rescored = build_rows_incremental(catalog, load_cache(cache_path))
+        write_cache(cache_path, cache)
+    else:
+        rows = build_rows(catalog, args.engine, args.lsh_bands, args.lsh_rows, args.workers)
     write_csv(Path(args.csv_out), rows)
 
     print(f"comparisons={len(rows)}")
     print(f"out={args.csv_out}")
+    if args.cache:
+        print(f"rescored_pairs={rescored}")
+    if args.report_recall:
+        matched, expected = recall(rows, build_rows(catalog))
+        print(f"recall={matched / expected if expected else 1.0:.4f} ({matched}/{expected} exact rows)")
 
 
 if __name__ == "__main__":
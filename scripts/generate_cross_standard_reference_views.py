@@ -5,6 +5,9 @@ from pathlib import Path
 
 import yaml
 
+from cross_reference_links import Link, links_from_records
+from cross_reference_snapshot import load_snapshot_links
+
 
 def load_yaml(path: Path):
     data = yaml.safe_load(path.read_text(encoding="utf-8"))
@@ -13,7 +16,7 @@ def load_yaml(path: Path):
     links = data.get("links", [])
     if not isinstance(links, list):
         raise ValueError(f"{path} must contain a 'links' list")
-    return links
+    return links_from_records(links)
 
 
 def alias(raw: str) -> str:
@@ -26,14 +29,14 @@ def s(value: str) -> str:
     return str(value).replace('"', "'")
 
 
-def should_include(link: dict, mode: str) -> bool:
-    rel = str(link.get("relation_type", ""))
+def should_include(link: Link, mode: str) -> bool:
+    rel = link.relation_type
     if mode == "all":
         return True
     if mode == "atag-wcag":
         return (
-            str(link.get("source_standard_id", "")) == "atag-2.0"
-            and str(link.get("target_standard_id", "")) == "wcag-2.2"
+            link.source_standard_id == "atag-2.0"
+            and link.target_standard_id == "wcag-2.2"
             and rel == "inferred_sc_reference_cross_standard"
         )
     if mode == "informative":
@@ -41,33 +44,33 @@ def should_include(link: dict, mode: str) -> bool:
     raise ValueError(f"unknown mode: {mode}")
 
 
-def link_label(link: dict, mode: str) -> str:
-    rel = str(link.get("relation_type", ""))
+def link_label(link: Link, mode: str) -> str:
+    rel = link.relation_type
     if mode == "atag-wcag":
-        code = str(link.get("target_criterion_code", ""))
-        profile = str(link.get("target_profile_ref", ""))
+        code = link.target_criterion_code
+        profile = link.target_profile_ref
         if profile:
             return f"{code} ({profile})"
         return code or rel
     if mode == "informative":
-        return str(link.get("basis", "")) or rel
+        return link.basis or rel
     return rel
 
 
-def source_node(link: dict) -> tuple[str, str]:
-    source_kind = str(link.get("source_kind", ""))
+def source_node(link: Link) -> tuple[str, str]:
+    source_kind = link.source_kind
     if source_kind == "informative_resource":
-        resource_id = str(link.get("source_resource_id", ""))
-        title = str(link.get("source_criterion_title", ""))
+        resource_id = link.source_resource_id
+        title = link.source_criterion_title
         nid = f"res_{alias(resource_id)}"
         label = f"resource:{resource_id}"
         if title:
             label += f" {title}"
         return nid, label
 
-    standard = str(link.get("source_standard_id", ""))
-    code = str(link.get("source_criterion_code", ""))
-    title = str(link.get("source_criterion_title", ""))
+    standard = link.source_standard_id
+    code = link.source_criterion_code
+    title = link.source_criterion_title
     nid = f"sc_{alias(standard)}_{alias(code)}"
     label = f"{standard} SC {code}"
     if title:
@@ -75,9 +78,9 @@ def source_node(link: dict) -> tuple[str, str]:
     return nid, label
 
 
-def target_node(link: dict) -> tuple[str, str]:
-    standard = str(link.get("target_standard_id", ""))
-    target_sc = str(link.get("target_criterion_code", ""))
+def target_node(link: Link) -> tuple[str, str]:
+    standard = link.target_standard_id
+    target_sc = link.target_criterion_code
     if target_sc:
         nid = f"sc_{alias(standard)}_{alias(target_sc)}"
         label = f"{standard} SC {target_sc}"
@@ -87,7 +90,7 @@ def target_node(link: dict) -> tuple[str, str]:
     return nid, label
 
 
-def build_mermaid(links: list[dict], mode: str, max_edges: int) -> str:
+def build_mermaid(links: list[Link], mode: str, max_edges: int) -> str:
     lines = ["graph LR"]
     node_defs = {}
     edge_count = 0
@@ -120,7 +123,12 @@ def write(path: Path, text: str):
 
 def main():
     parser = argparse.ArgumentParser(description="Generate Mermaid views for cross-standard references")
-    parser.add_argument("--dataset-yaml", required=True)
+    parser.add_argument("--dataset-yaml", default="")
+    parser.add_argument(
+        "--dataset-snapshot",
+        default="",
+        help="Read links from a columnar snapshot instead of --dataset-yaml",
+    )
     parser.add_argument("--full-mmd-out", required=True)
     parser.add_argument("--atag-wcag-mmd-out", required=True)
     parser.add_argument("--informative-mmd-out", required=True)
@@ -128,7 +136,12 @@ def main():
     parser.add_argument("--max-edges-filtered", type=int, default=500)
     args = parser.parse_args()
 
-    links = load_yaml(Path(args.dataset_yaml))
+    if args.dataset_snapshot:
+        links = load_snapshot_links(Path(args.dataset_snapshot))
+    elif args.dataset_yaml:
+        links = load_yaml(Path(args.dataset_yaml))
+    else:
+        parser.error("Specify --dataset-yaml or --dataset-snapshot")
 
     full_text = build_mermaid(links, mode="all", max_edges=args.max_edges_full)
     atag_wcag_text = build_mermaid(links, mode="atag-wcag", max_edges=args.max_edges_filtered)
@@ -1,17 +1,50 @@
 #!/usr/bin/env python3
 import argparse
 import csv
+import hashlib
+import json
 import re
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 
 import yaml
 
-SC_REF_RE = re.compile(r"(?:Success\s+Criterion|SC)\s*([1-4]\.\d+\.\d+)", re.IGNORECASE)
-WCAG_RE = re.compile(r"\bWCAG(?:\s*2\.0|\s*2\.1|\s*2\.2)?\b", re.IGNORECASE)
-ATAG_RE = re.compile(r"\bATAG(?:\s*2\.0)?\b", re.IGNORECASE)
-UAAG_RE = re.compile(r"\bUAAG(?:\s*2\.0)?\b", re.IGNORECASE)
-ARIA_RE = re.compile(r"\bWAI-ARIA\b|\bARIA\b", re.IGNORECASE)
+from cross_reference_links import LINK_FIELDNAMES, Link, links_from_records
+from cross_reference_snapshot import SnapshotWriter
+from http_pool import atomic_open, atomic_write_text
+from standards_registry import (
+    MENTION_FAMILIES,
+    NORMATIVE_STANDARDS,
+    SC_REFERENCE_PRECEDENCE,
+    STANDARDS,
+    VERSION_MARKERS,
+    mention_leading_chars,
+    normalize_standard_id,
+)
+
+SC_REF_PATTERN = r"(?:Success\s+Criterion|SC)\s*(?P<sc_code>[1-4]\.\d+\.\d+)"
+VERSION_MARKER_WINDOW = max(len(marker) for marker in VERSION_MARKERS) - 1
+
+# One alternation so normative text is traversed once for SC codes, standard
+# mentions and the version markers used to resolve a mention family. The
+# leading lookahead lets the scanner skip positions no alternative starts at.
+MENTION_RE = re.compile(
+    f"(?=[S{mention_leading_chars()}])(?:"
+    + "|".join(
+        [f"(?P<sc>{SC_REF_PATTERN})"]
+        + [f"(?P<{name}>{family['pattern']})" for name, family in MENTION_FAMILIES.items()]
+        + ["(?P<version>" + "|".join(re.escape(marker) for marker in VERSION_MARKERS) + ")"]
+    )
+    + ")",
+    re.IGNORECASE,
+)
+
+MANIFEST_VERSION = 2
+NORMATIVE_INPUTS = [entry["normative"]["arg"] for entry in NORMATIVE_STANDARDS]
+LINK_GROUPS = ["direct", "inferred", "informative"]
 
 
 def load_yaml(path: Path):
@@ -21,23 +54,6 @@ def load_yaml(path: Path):
     return data
 
 
-def normalize_standard_id(raw: str) -> str:
-    value = str(raw).strip().lower()
-    mapping = {
-        "wcag-2.2": "wcag-2.2",
-        "wcag-2.0": "wcag-2.0",
-        "wcag-2.0-legacy": "wcag-2.0",
-        "atag-2.0": "atag-2.0",
-        "atag-2": "atag-2.0",
-        "uaag-2.0": "uaag-2.0",
-        "uaag-2": "uaag-2.0",
-        "wai-aria": "wai-aria-1.2",
-        "aria": "wai-aria-1.2",
-        "wai-aria-1.2": "wai-aria-1.2",
-    }
-    return mapping.get(value, str(raw).strip())
-
-
 def build_normative_index(data: dict):
     standard_id = normalize_standard_id(data.get("standard_id", ""))
     tr_url = str(data.get("tr_url", ""))
@@ -70,22 +86,37 @@ def build_normative_index(data: dict):
     }
 
 
-def detect_explicit_standard_mentions(text: str):
+def scan_mentions(text: str):
+    for match in MENTION_RE.finditer(text):
+        kind = match.lastgroup
+        value = match.group("sc_code") if kind == "sc" else match.group(0)
+        yield kind, value, match.start(), match.end()
+
+
+def detect_references(text: str):
+    sc_refs = set()
+    families = set()
+    markers = set()
+    for kind, value, start, end in scan_mentions(text):
+        if kind == "sc":
+            sc_refs.add(value)
+        elif kind != "version":
+            families.add(kind)
+        # A version marker may start inside a consumed match and run past its
+        # end (e.g. "2.0" in "WCAG 2.2.0"), so look beyond the match as well.
+        window = text[start : end + VERSION_MARKER_WINDOW]
+        markers.update(marker for marker in VERSION_MARKERS if marker in window)
+
     mentions = set()
-    if WCAG_RE.search(text):
-        if "2.0" in text:
-            mentions.add("wcag-2.0")
-        elif "2.2" in text:
-            mentions.add("wcag-2.2")
+    for family in families:
+        spec = MENTION_FAMILIES[family]
+        for marker, standard_id in spec.get("version_markers", []):
+            if marker in markers:
+                mentions.add(standard_id)
+                break
         else:
-            mentions.add("wcag-2.0")
-    if ATAG_RE.search(text):
-        mentions.add("atag-2.0")
-    if UAAG_RE.search(text):
-        mentions.add("uaag-2.0")
-    if ARIA_RE.search(text):
-        mentions.add("wai-aria-1.2")
-    return mentions
+            mentions.add(spec["default"])
+    return sc_refs, mentions
 
 
 def excerpt(text: str, limit: int = 180):
@@ -95,19 +126,13 @@ def excerpt(text: str, limit: int = 180):
     return compact[: limit - 1] + "…"
 
 
-def add_link(links: list[dict], link: dict):
-    links.append(link)
-
-
 def build_direct_normative_links(normative_indexes: dict[str, dict]):
-    links = []
     seen = set()
 
     for source_standard_id, idx in normative_indexes.items():
         for row in idx["criteria"]:
             text = row["normative_text"]
-            sc_refs = set(SC_REF_RE.findall(text))
-            mentioned_standards = detect_explicit_standard_mentions(text)
+            sc_refs, mentioned_standards = detect_references(text)
 
             for mentioned in sorted(mentioned_standards):
                 if mentioned == source_standard_id:
@@ -121,37 +146,30 @@ def build_direct_normative_links(normative_indexes: dict[str, dict]):
                 if key in seen:
                     continue
                 seen.add(key)
-                add_link(
-                    links,
-                    {
-                        "relation_type": "direct_standard_reference",
-                        "basis": "direct",
-                        "confidence": "high",
-                        "source_kind": "normative_success_criterion",
-                        "source_standard_id": source_standard_id,
-                        "source_criterion_id": row["criterion_id"],
-                        "source_criterion_code": row["criterion_code"],
-                        "source_criterion_title": row["criterion_title"],
-                        "source_url": row["criterion_url"],
-                        "target_standard_id": mentioned,
-                        "target_criterion_code": "",
-                        "target_profile_ref": "",
-                        "target_url": normative_indexes.get(mentioned, {}).get("standard_url", ""),
-                        "evidence_excerpt": excerpt(text),
-                        "source_dataset": "normative_text_pattern_match",
-                    },
+                yield Link(
+                    relation_type="direct_standard_reference",
+                    basis="direct",
+                    confidence="high",
+                    source_kind="normative_success_criterion",
+                    source_standard_id=source_standard_id,
+                    source_criterion_id=row["criterion_id"],
+                    source_criterion_code=row["criterion_code"],
+                    source_criterion_title=row["criterion_title"],
+                    source_url=row["criterion_url"],
+                    target_standard_id=mentioned,
+                    target_criterion_code="",
+                    target_profile_ref="",
+                    target_url=normative_indexes.get(mentioned, {}).get("standard_url", ""),
+                    evidence_excerpt=excerpt(text),
+                    source_dataset="normative_text_pattern_match",
                 )
 
             for ref_code in sorted(sc_refs):
                 candidate_targets = [source_standard_id]
-                if "wcag-2.0" in mentioned_standards:
-                    candidate_targets = ["wcag-2.0"]
-                elif "wcag-2.2" in mentioned_standards:
-                    candidate_targets = ["wcag-2.2"]
-                elif "atag-2.0" in mentioned_standards:
-                    candidate_targets = ["atag-2.0"]
-                elif "uaag-2.0" in mentioned_standards:
-                    candidate_targets = ["uaag-2.0"]
+                for standard_id in SC_REFERENCE_PRECEDENCE:
+                    if standard_id in mentioned_standards:
+                        candidate_targets = [standard_id]
+                        break
 
                 for target_standard in candidate_targets:
                     target_index = normative_indexes.get(target_standard, {}).get("criteria_by_code", {})
@@ -169,32 +187,26 @@ def build_direct_normative_links(normative_indexes: dict[str, dict]):
                     if key in seen:
                         continue
                     seen.add(key)
-                    add_link(
-                        links,
-                        {
-                            "relation_type": relation_type,
-                            "basis": "direct",
-                            "confidence": "high",
-                            "source_kind": "normative_success_criterion",
-                            "source_standard_id": source_standard_id,
-                            "source_criterion_id": row["criterion_id"],
-                            "source_criterion_code": row["criterion_code"],
-                            "source_criterion_title": row["criterion_title"],
-                            "source_url": row["criterion_url"],
-                            "target_standard_id": target_standard,
-                            "target_criterion_code": ref_code,
-                            "target_profile_ref": "",
-                            "target_url": target_row.get("criterion_url", ""),
-                            "evidence_excerpt": excerpt(text),
-                            "source_dataset": "normative_text_pattern_match",
-                        },
+                    yield Link(
+                        relation_type=relation_type,
+                        basis="direct",
+                        confidence="high",
+                        source_kind="normative_success_criterion",
+                        source_standard_id=source_standard_id,
+                        source_criterion_id=row["criterion_id"],
+                        source_criterion_code=row["criterion_code"],
+                        source_criterion_title=row["criterion_title"],
+                        source_url=row["criterion_url"],
+                        target_standard_id=target_standard,
+                        target_criterion_code=ref_code,
+                        target_profile_ref="",
+                        target_url=target_row.get("criterion_url", ""),
+                        evidence_excerpt=excerpt(text),
+                        source_dataset="normative_text_pattern_match",
                     )
 
-    return links
-
 
 def build_inferred_crosswalk_links(crosswalk: dict, wcag_index: dict):
-    links = []
     profiles = crosswalk.get("target_profiles", {})
     mappings = crosswalk.get("mappings", [])
 
@@ -209,31 +221,26 @@ def build_inferred_crosswalk_links(crosswalk: dict, wcag_index: dict):
             for wcag_code in profile.get("criterion_codes", []):
                 wcag_code = str(wcag_code).strip()
                 target_row = wcag_index.get("criteria_by_code", {}).get(wcag_code, {})
-                links.append(
-                    {
-                        "relation_type": "inferred_sc_reference_cross_standard",
-                        "basis": "inferred_profile_mapping",
-                        "confidence": "medium",
-                        "source_kind": "normative_success_criterion",
-                        "source_standard_id": "atag-2.0",
-                        "source_criterion_id": source_id,
-                        "source_criterion_code": source_code,
-                        "source_criterion_title": source_title,
-                        "source_url": source_url,
-                        "target_standard_id": "wcag-2.2",
-                        "target_criterion_code": wcag_code,
-                        "target_profile_ref": str(profile_ref),
-                        "target_url": str(target_row.get("criterion_url", "")),
-                        "evidence_excerpt": f"ATAG crosswalk mapping via {profile_ref}",
-                        "source_dataset": "atag-to-wcag-2.2-crosswalk.yaml",
-                    }
+                yield Link(
+                    relation_type="inferred_sc_reference_cross_standard",
+                    basis="inferred_profile_mapping",
+                    confidence="medium",
+                    source_kind="normative_success_criterion",
+                    source_standard_id="atag-2.0",
+                    source_criterion_id=source_id,
+                    source_criterion_code=source_code,
+                    source_criterion_title=source_title,
+                    source_url=source_url,
+                    target_standard_id="wcag-2.2",
+                    target_criterion_code=wcag_code,
+                    target_profile_ref=str(profile_ref),
+                    target_url=str(target_row.get("criterion_url", "")),
+                    evidence_excerpt=f"ATAG crosswalk mapping via {profile_ref}",
+                    source_dataset="atag-to-wcag-2.2-crosswalk.yaml",
                 )
 
-    return links
-
 
 def build_informative_links(informative_data: dict, standard_url_map: dict):
-    links = []
     for item in informative_data.get("resources", []):
         source_id = str(item.get("id", "")).strip()
         source_url = str(item.get("url", "")).strip()
@@ -244,191 +251,365 @@ def build_informative_links(informative_data: dict, standard_url_map: dict):
 
         for raw_target in applies_to:
             target_standard = normalize_standard_id(str(raw_target))
-            links.append(
-                {
-                    "relation_type": "informative_resource_reference_standard",
-                    "basis": "catalog_applies_to",
-                    "confidence": "high",
-                    "source_kind": "informative_resource",
-                    "source_standard_id": "",
-                    "source_criterion_id": "",
-                    "source_criterion_code": "",
-                    "source_criterion_title": source_title,
-                    "source_resource_id": source_id,
-                    "source_url": source_url,
-                    "target_standard_id": target_standard,
-                    "target_criterion_code": "",
-                    "target_profile_ref": "",
-                    "target_url": standard_url_map.get(target_standard, ""),
-                    "evidence_excerpt": f"informative resource applies_to includes {raw_target}",
-                    "source_dataset": "w3c-wai-informative-resources.yaml",
-                }
+            yield Link(
+                relation_type="informative_resource_reference_standard",
+                basis="catalog_applies_to",
+                confidence="high",
+                source_kind="informative_resource",
+                source_standard_id="",
+                source_criterion_id="",
+                source_criterion_code="",
+                source_criterion_title=source_title,
+                source_resource_id=source_id,
+                source_url=source_url,
+                target_standard_id=target_standard,
+                target_criterion_code="",
+                target_profile_ref="",
+                target_url=standard_url_map.get(target_standard, ""),
+                evidence_excerpt=f"informative resource applies_to includes {raw_target}",
+                source_dataset="w3c-wai-informative-resources.yaml",
             )
 
-    return links
-
 
-def dedupe_links(links: list[dict]):
-    out = []
+def dedupe_links(links):
     seen = set()
     for link in links:
-        key = (
-            link.get("relation_type", ""),
-            link.get("source_kind", ""),
-            link.get("source_standard_id", ""),
-            link.get("source_criterion_code", ""),
-            link.get("source_resource_id", ""),
-            link.get("target_standard_id", ""),
-            link.get("target_criterion_code", ""),
-            link.get("target_profile_ref", ""),
-        )
+        key = link.dedupe_key()
         if key in seen:
             continue
         seen.add(key)
-        out.append(link)
-    return out
-
-
-def write_csv(path: Path, links: list[dict]):
-    fieldnames = [
-        "link_id",
-        "relation_type",
-        "basis",
-        "confidence",
-        "source_kind",
-        "source_standard_id",
-        "source_criterion_id",
-        "source_criterion_code",
-        "source_criterion_title",
-        "source_resource_id",
-        "source_url",
-        "target_standard_id",
-        "target_criterion_code",
-        "target_profile_ref",
-        "target_url",
-        "evidence_excerpt",
-        "source_dataset",
-    ]
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8", newline="") as fp:
-        writer = csv.DictWriter(fp, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(links)
-
-
-def write_yaml(path: Path, payload: dict):
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(yaml.safe_dump(payload, sort_keys=False, allow_unicode=True), encoding="utf-8")
+        yield link
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as fp:
+        for chunk in iter(lambda: fp.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def json_sha256(value) -> str:
+    encoded = json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def load_manifest(path: Path):
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("manifest_version") != MANIFEST_VERSION:
+        return {}
+    return data
+
+
+def write_manifest(path: Path, manifest: dict):
+    atomic_write_text(path, json.dumps(manifest, ensure_ascii=False, indent=1) + "\n")
+
+
+def outputs_match_manifest(manifest: dict, paths: list[Path]) -> bool:
+    recorded = manifest.get("outputs", {})
+    if not isinstance(recorded, dict):
+        return False
+    return all(path.exists() and recorded.get(str(path)) == file_sha256(path) for path in paths)
+
+
+def build_standard_url_map(indexes: dict[str, dict]):
+    urls = {}
+    for entry in STANDARDS:
+        normative = entry.get("normative")
+        urls[entry["id"]] = indexes[normative["arg"]]["standard_url"] if normative else entry["tr_url"]
+    return urls
+
+
+def load_normative_index(path: Path):
+    return build_normative_index(load_yaml(path))
+
+
+def load_normative_indexes(paths: dict[str, Path], jobs: int):
+    if jobs > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as executor:
+            return dict(zip(paths, executor.map(load_normative_index, paths.values())))
+    return {name: load_normative_index(path) for name, path in paths.items()}
+
+
+# Reuse a link subset from the previous manifest when the content hashes of
+# the inputs it was built from are unchanged; normative YAMLs are only parsed
+# when a subset (or the standard URL map) that depends on them is rebuilt.
+# Rebuilt subsets are returned as lazy link iterators.
+def build_link_groups(input_paths: dict[str, Path], previous: dict, jobs: int = 1):
+    hashes = {name: file_sha256(path) for name, path in input_paths.items()}
+    previous_groups = previous.get("groups", {})
+
+    def reuse(group: str, inputs: dict):
+        entry = previous_groups.get(group) if isinstance(previous_groups, dict) else None
+        if isinstance(entry, dict) and entry.get("inputs") == inputs and isinstance(entry.get("links"), list):
+            return {"inputs": inputs, "links": links_from_records(entry["links"])}
+        return None
+
+    direct_inputs = {name: hashes[name] for name in NORMATIVE_INPUTS}
+    direct = reuse("direct", direct_inputs)
+    inferred_inputs = {"crosswalk": hashes["crosswalk"], "wcag22": hashes["wcag22"]}
+    inferred = reuse("inferred", inferred_inputs)
+    url_inputs = {name: hashes[name] for name in NORMATIVE_INPUTS}
+    standard_urls = previous.get("standard_urls")
+    if not isinstance(standard_urls, dict) or standard_urls.get("inputs") != url_inputs:
+        standard_urls = None
+
+    needed = set()
+    if direct is None or standard_urls is None:
+        needed.update(NORMATIVE_INPUTS)
+    if inferred is None:
+        needed.add("wcag22")
+    indexes = load_normative_indexes(
+        {name: input_paths[name] for name in NORMATIVE_INPUTS if name in needed},
+        jobs,
+    )
+
+    groups = {}
+    rebuilt = []
+
+    if direct is None:
+        normative_indexes = {indexes[name]["standard_id"]: indexes[name] for name in NORMATIVE_INPUTS}
+        direct = {"inputs": direct_inputs, "links": dedupe_links(build_direct_normative_links(normative_indexes))}
+        rebuilt.append("direct")
+    groups["direct"] = direct
+
+    if inferred is None:
+        crosswalk = load_yaml(input_paths["crosswalk"])
+        links = dedupe_links(build_inferred_crosswalk_links(crosswalk, indexes["wcag22"]))
+        inferred = {"inputs": inferred_inputs, "links": links}
+        rebuilt.append("inferred")
+    groups["inferred"] = inferred
+
+    if standard_urls is None:
+        standard_urls = {"inputs": url_inputs, "urls": build_standard_url_map(indexes)}
+
+    informative_inputs = {"informative": hashes["informative"], "standard_urls": standard_urls["urls"]}
+    informative = reuse("informative", informative_inputs)
+    if informative is None:
+        catalog = load_yaml(input_paths["informative"])
+        links = dedupe_links(build_informative_links(catalog, standard_urls["urls"]))
+        informative = {"inputs": informative_inputs, "links": links}
+        rebuilt.append("informative")
+    groups["informative"] = informative
+
+    return groups, standard_urls, rebuilt
+
+
+def dump_yaml(value) -> str:
+    return yaml.safe_dump(value, sort_keys=False, allow_unicode=True)
+
+
+def iter_links(groups: dict):
+    count = 0
+    for name in LINK_GROUPS:
+        for link in groups[name]["links"]:
+            count += 1
+            link.link_id = f"xref-{count:05d}"
+            yield link
+
+
+# Write each link to the YAML links block, the CSV, and the snapshot as it is
+# produced. "links" is the last key of the payload, so the block is the tail
+# of the YAML file and is hashed for the updated-date decision.
+def stream_links(links, yaml_fp, csv_fp, snapshot=None):
+    writer = csv.DictWriter(csv_fp, fieldnames=LINK_FIELDNAMES)
+    writer.writeheader()
+    digest = hashlib.sha256()
+    by_type = {}
+
+    def emit(text: str):
+        yaml_fp.write(text)
+        digest.update(text.encode("utf-8"))
+
+    for link in links:
+        if not by_type:
+            emit("links:\n")
+        record = link.to_dict()
+        emit(dump_yaml([record]))
+        writer.writerow(record)
+        if snapshot is not None:
+            snapshot.add(record)
+        by_type[link.relation_type] = by_type.get(link.relation_type, 0) + 1
+    if not by_type:
+        emit("links: []\n")
+    return digest.hexdigest(), by_type
+
+
+def read_existing_links_block(path: Path):
+    header_lines = []
+    digest = None
+    with path.open(encoding="utf-8") as fp:
+        for line in fp:
+            if digest is None and line.startswith("links:"):
+                digest = hashlib.sha256()
+            if digest is None:
+                header_lines.append(line)
+            else:
+                digest.update(line.encode("utf-8"))
+    header = yaml.safe_load("".join(header_lines))
+    if digest is None or not isinstance(header, dict):
+        return None, None
+    return header.get("updated"), digest.hexdigest()
 
 
 def main():
     parser = argparse.ArgumentParser(description="Generate cross-standard references dataset (direct + inferred)")
-    parser.add_argument("--wcag22-yaml", required=True)
-    parser.add_argument("--wcag20-yaml", required=True)
-    parser.add_argument("--atag-yaml", required=True)
-    parser.add_argument("--uaag-yaml", required=True)
+    for entry in NORMATIVE_STANDARDS:
+        parser.add_argument(f"--{entry['normative']['arg']}-yaml", default=entry["normative"]["yaml"])
     parser.add_argument("--crosswalk-yaml", required=True)
     parser.add_argument("--informative-yaml", required=True)
     parser.add_argument("--out-yaml", required=True)
     parser.add_argument("--out-csv", required=True)
+    parser.add_argument(
+        "--out-snapshot",
+        default="",
+        help="Optional path for a memory-mappable columnar snapshot of the links",
+    )
+    parser.add_argument(
+        "--manifest",
+        default="",
+        help="Optional build manifest (JSON) used to reuse link subsets whose inputs are unchanged",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Load and index the normative YAMLs in this many worker processes",
+    )
     args = parser.parse_args()
 
-    wcag22 = build_normative_index(load_yaml(Path(args.wcag22_yaml)))
-    wcag20 = build_normative_index(load_yaml(Path(args.wcag20_yaml)))
-    atag = build_normative_index(load_yaml(Path(args.atag_yaml)))
-    uaag = build_normative_index(load_yaml(Path(args.uaag_yaml)))
-    crosswalk = load_yaml(Path(args.crosswalk_yaml))
-    informative = load_yaml(Path(args.informative_yaml))
-
-    normative_indexes = {
-        wcag22["standard_id"]: wcag22,
-        wcag20["standard_id"]: wcag20,
-        atag["standard_id"]: atag,
-        uaag["standard_id"]: uaag,
-    }
-
-    standard_url_map = {
-        "wcag-2.2": wcag22["standard_url"],
-        "wcag-2.0": wcag20["standard_url"],
-        "atag-2.0": atag["standard_url"],
-        "uaag-2.0": uaag["standard_url"],
-        "wai-aria-1.2": "https://www.w3.org/TR/wai-aria-1.2/",
-    }
+    input_paths = {name: Path(getattr(args, f"{name}_yaml")) for name in NORMATIVE_INPUTS}
+    input_paths["crosswalk"] = Path(args.crosswalk_yaml)
+    input_paths["informative"] = Path(args.informative_yaml)
+    manifest_path = Path(args.manifest) if args.manifest else None
+    previous = load_manifest(manifest_path) if manifest_path else {}
 
-    links = []
-    links.extend(build_direct_normative_links(normative_indexes))
-    links.extend(build_inferred_crosswalk_links(crosswalk, wcag22))
-    links.extend(build_informative_links(informative, standard_url_map))
+    groups, standard_urls, rebuilt = build_link_groups(input_paths, previous, args.jobs)
+    if manifest_path:
+        # The manifest caches every subset, so those have to be materialised.
+        for group in groups.values():
+            group["links"] = list(group["links"])
 
-    links = dedupe_links(links)
-
-    for idx, item in enumerate(links, start=1):
-        item["link_id"] = f"xref-{idx:05d}"
-        if "source_resource_id" not in item:
-            item["source_resource_id"] = ""
-
-    # Preserve the existing updated date if the links data has not changed,
-    # so that re-running the script on an unmodified repo does not produce a
-    # spurious date-only diff that would break the "artifacts are committed"
-    # CI check.
     out_path = Path(args.out_yaml)
-    updated_date = datetime.now(timezone.utc).date().isoformat()
-    if out_path.exists():
-        try:
-            existing = yaml.safe_load(out_path.read_text(encoding="utf-8"))
-            if isinstance(existing, dict) and existing.get("links") == links:
-                updated_date = existing.get("updated", updated_date)
-        except (OSError, yaml.YAMLError, ValueError):
-            pass
-
-    payload = {
-        "dataset_id": "cross-standard-references",
-        "updated": updated_date,
-        "description": "Direct and inferred references between standards criteria and informative resources.",
-        "relation_types": [
-            {
-                "id": "direct_sc_reference_cross_standard",
-                "description": "A normative success criterion explicitly references a success criterion in another standard.",
-            },
-            {
-                "id": "direct_sc_reference_intra_standard",
-                "description": "A normative success criterion explicitly references another criterion in the same standard.",
-            },
-            {
-                "id": "direct_standard_reference",
-                "description": "A normative success criterion explicitly references another standard without a specific criterion code.",
-            },
-            {
-                "id": "inferred_sc_reference_cross_standard",
-                "description": "A cross-standard SC reference inferred through profile mapping (not an explicit inline citation).",
+    csv_path = Path(args.out_csv)
+    snapshot_path = Path(args.out_snapshot) if args.out_snapshot else None
+    output_paths = [out_path, csv_path]
+    if snapshot_path:
+        output_paths.append(snapshot_path)
+    manifest_current = bool(previous) and outputs_match_manifest(previous, output_paths)
+
+    # Dedupe keys include relation_type and each group emits its own relation
+    # types, so per-group dedupe is equivalent to deduping the combined list.
+    # The links block is spooled to a temporary file because the updated date
+    # in the header depends on it.
+    for path in output_paths:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    csv_tmp = csv_path.with_name(csv_path.name + ".tmp")
+    snapshot = SnapshotWriter(LINK_FIELDNAMES) if snapshot_path else None
+    with tempfile.TemporaryFile("w+", encoding="utf-8", dir=out_path.parent) as links_block:
+        with csv_tmp.open("w", encoding="utf-8", newline="") as csv_fp:
+            links_digest, by_type = stream_links(iter_links(groups), links_block, csv_fp, snapshot)
+
+        # Preserve the existing updated date if the links data has not changed,
+        # so that re-running the script on an unmodified repo does not produce a
+        # spurious date-only diff that would break the "artifacts are committed"
+        # CI check.
+        # With a manifest whose recorded output hashes still match the files on
+        # disk, compare link digests instead of re-reading the existing YAML.
+        updated_date = datetime.now(timezone.utc).date().isoformat()
+        if manifest_current:
+            if previous.get("links_sha256") == links_digest:
+                updated_date = previous.get("updated", updated_date)
+        elif out_path.exists():
+            try:
+                existing_updated, existing_digest = read_existing_links_block(out_path)
+                if existing_digest == links_digest and existing_updated:
+                    updated_date = existing_updated
+            except (OSError, yaml.YAMLError, ValueError):
+                pass
+
+        header = {
+            "dataset_id": "cross-standard-references",
+            "updated": updated_date,
+            "description": "Direct and inferred references between standards criteria and informative resources.",
+            "relation_types": [
+                {
+                    "id": "direct_sc_reference_cross_standard",
+                    "description": "A normative success criterion explicitly references a success criterion in another standard.",
+                },
+                {
+                    "id": "direct_sc_reference_intra_standard",
+                    "description": "A normative success criterion explicitly references another criterion in the same standard.",
+                },
+                {
+                    "id": "direct_standard_reference",
+                    "description": "A normative success criterion explicitly references another standard without a specific criterion code.",
+                },
+                {
+                    "id": "inferred_sc_reference_cross_standard",
+                    "description": "A cross-standard SC reference inferred through profile mapping (not an explicit inline citation).",
+                },
+                {
+                    "id": "informative_resource_reference_standard",
+                    "description": "An informative resource links to or applies to another standard.",
+                },
+            ],
+            "source_inputs": {
+                **{
+                    entry["normative"]["source_input"]: getattr(args, f"{entry['normative']['arg']}_yaml")
+                    for entry in NORMATIVE_STANDARDS
+                },
+                "atag_wcag_crosswalk": args.crosswalk_yaml,
+                "informative_catalog": args.informative_yaml,
             },
+        }
+        header_text = dump_yaml(header)
+
+        payload_digest = json_sha256([header_text, links_digest])
+        unchanged = manifest_current and previous.get("payload_sha256") == payload_digest
+        if unchanged:
+            csv_tmp.unlink()
+        else:
+            with atomic_open(out_path, "w", encoding="utf-8") as fp:
+                fp.write(header_text)
+                links_block.seek(0)
+                shutil.copyfileobj(links_block, fp)
+            csv_tmp.replace(csv_path)
+            if snapshot_path:
+                snapshot.write(snapshot_path)
+
+    if manifest_path:
+        write_manifest(
+            manifest_path,
             {
-                "id": "informative_resource_reference_standard",
-                "description": "An informative resource links to or applies to another standard.",
+                "manifest_version": MANIFEST_VERSION,
+                "updated": updated_date,
+                "links_sha256": links_digest,
+                "payload_sha256": payload_digest,
+                "outputs": {str(path): file_sha256(path) for path in output_paths},
+                "standard_urls": standard_urls,
+                "groups": {
+                    name: {"inputs": group["inputs"], "links": [link.to_dict() for link in group["links"]]}
+                    for name, group in groups.items()
+                },
             },
-        ],
-        "source_inputs": {
-            "wcag_22_normative": args.wcag22_yaml,
-            "wcag_20_normative": args.wcag20_yaml,
-            "atag_20_normative": args.atag_yaml,
-            "uaag_20_normative": args.uaag_yaml,
-            "atag_wcag_crosswalk": args.crosswalk_yaml,
-            "informative_catalog": args.informative_yaml,
-        },
-        "links": links,
-    }
-
-    write_yaml(out_path, payload)
-    write_csv(Path(args.out_csv), links)
+        )
 
-    print(f"links={len(links)}")
-    by_type = {}
-    for item in links:
-        by_type[item["relation_type"]] = by_type.get(item["relation_type"], 0) + 1
+    print(f"links={sum(by_type.values())}")
     for key in sorted(by_type):
         print(f"{key}={by_type[key]}")
     print(f"yaml={args.out_yaml}")
     print(f"csv={args.out_csv}")
+    if args.out_snapshot:
+        print(f"snapshot={args.out_snapshot}")
+    if manifest_path:
+        print(f"rebuilt_groups={','.join(rebuilt) or 'none'}")
+        print(f"outputs_unchanged={str(unchanged).lower()}")
 
 
 if __name__ == "__main__":
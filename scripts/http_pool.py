@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""Thread-safe keep-alive HTTP connections shared by the fetching scripts.
+
+urlopen opens a new TCP (and TLS) connection for every request. The pool keeps
+idle http.client connections per (scheme, host, port) and hands them to
+whichever thread requests that host next. With max_per_host, at most that
+many requests run against one host at a time. Behaviour otherwise follows
+urlopen: redirects are followed, non-2xx responses raise
+urllib.error.HTTPError, and connection errors or malformed responses raise
+urllib.error.URLError.
+
+atomic_open and the atomic_write_* helpers are the single way the scripts
+replace cache and output files: data goes to <name>.tmp, which is moved over
+the target only once it is complete and removed if writing fails.
+"""
+import hashlib
+import http.client
+import io
+import json
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.error import HTTPError, URLError
+from urllib.parse import urljoin, urlsplit
+
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+MAX_REDIRECTS = 10
+READ_CHUNK_SIZE = 64 * 1024
+
+# Errors raised when a kept-alive connection was closed by the server while
+# idle; the request is retried once on a fresh connection.
+_STALE_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+@contextmanager
+def atomic_open(path, mode: str = "w", **kwargs):
+    """Open <path>.tmp for writing and move it over path when the block succeeds."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        with tmp_path.open(mode, **kwargs) as fp:
+            yield fp
+        tmp_path.replace(path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def atomic_write_bytes(path, data: bytes):
+    with atomic_open(path, "wb") as fp:
+        fp.write(data)
+
+
+def atomic_write_text(path, text: str, encoding: str = "utf-8"):
+    with atomic_open(path, "w", encoding=encoding) as fp:
+        fp.write(text)
+
+
+def host_key(url: str):
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https"):
+        raise ValueError(f"unsupported URL scheme: {url}")
+    return scheme, parts.hostname or "", parts.port or (443 if scheme == "https" else 80)
+
+
+class ConnectionPool:
+    def __init__(
+        self,
+        timeout: float = 60,
+        headers: dict | None = None,
+        max_idle_per_host: int = 4,
+        max_per_host: int = 0,
+    ):
+        self.timeout = timeout
+        self.headers = dict(headers or {})
+        self.max_idle_per_host = max_idle_per_host
+        self.max_per_host = max_per_host
+        self.connections_opened = 0
+        self._idle = {}
+        self._host_slots = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            idle = [conn for connections in self._idle.values() for conn in connections]
+            self._idle.clear()
+        for conn in idle:
+            conn.close()
+
+    def _slots(self, key):
+        with self._lock:
+            slots = self._host_slots.get(key)
+            if slots is None:
+                slots = self._host_slots[key] = threading.BoundedSemaphore(self.max_per_host)
+            return slots
+
+    # A host slot is held from _acquire until the connection is checked in.
+    def _acquire(self, key):
+        if self.max_per_host:
+            self._slots(key).acquire()
+        with self._lock:
+            connections = self._idle.get(key)
+            if connections:
+                return connections.pop(), True
+            self.connections_opened += 1
+        scheme, host, port = key
+        connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return connection_class(host, port, timeout=self.timeout), False
+
+    def _checkin(self, key, conn, reusable: bool):
+        try:
+            if reusable:
+                with self._lock:
+                    connections = self._idle.setdefault(key, [])
+                    if len(connections) < self.max_idle_per_host:
+                        connections.append(conn)
+                        return
+            conn.close()
+        finally:
+            if self.max_per_host:
+                self._slots(key).release()
+
+    def _release(self, key, conn, response):
+        self._checkin(key, conn, not response.will_close and response.isclosed())
+
+    def _send(self, method: str, url: str, headers: dict):
+        key = host_key(url)
+        parts = urlsplit(url)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        while True:
+            conn, reused = self._acquire(key)
+            try:
+                conn.request(method, target, headers=headers)
+                return key, conn, conn.getresponse()
+            except _STALE_ERRORS as exc:
+                self._checkin(key, conn, False)
+                if not reused:
+                    raise URLError(exc) from exc
+            except (OSError, http.client.HTTPException) as exc:
+                self._checkin(key, conn, False)
+                raise URLError(exc) from exc
+            except BaseException:
+                self._checkin(key, conn, False)
+                raise
+
+    @contextmanager
+    def open(self, url: str, method: str = "GET", headers: dict | None = None):
+        """Yield the live response; its body may be read incrementally."""
+        request_headers = {**self.headers, **(headers or {})}
+        for _ in range(MAX_REDIRECTS + 1):
+            key, conn, response = self._send(method, url, request_headers)
+            location = response.getheader("Location")
+            if response.status in REDIRECT_STATUSES and location:
+                response.read()
+                self._release(key, conn, response)
+                url = urljoin(url, location)
+                if response.status == 303 and method != "HEAD":
+                    method = "GET"
+                continue
+            if not 200 <= response.status < 300:
+                body = response.read()
+                self._release(key, conn, response)
+                raise HTTPError(url, response.status, response.reason, response.headers, io.BytesIO(body))
+
+            response.url = url
+            try:
+                yield response
+            finally:
+                if response.length == 0:
+                    # HEAD and empty responses: mark the response done so the
+                    # connection can be reused.
+                    response.read()
+                self._release(key, conn, response)
+            return
+        raise HTTPError(url, response.status, "too many redirects", response.headers, None)
+
+    def read(self, url: str, method: str = "GET", headers: dict | None = None) -> bytes:
+        with self.open(url, method=method, headers=headers) as response:
+            return response.read()
+
+
+class CachedResponse:
+    __slots__ = ("url", "path", "sha256", "not_modified")
+
+    def __init__(self, url: str, path: Path, sha256: str, not_modified: bool):
+        self.url = url
+        self.path = path
+        self.sha256 = sha256
+        self.not_modified = not_modified
+
+    def open(self):
+        return self.path.open("rb")
+
+    def read(self) -> bytes:
+        return self.path.read_bytes()
+
+
+class ResponseCache:
+    """On-disk response bodies revalidated with ETag/Last-Modified.
+
+    Each URL has <key>.body and <key>.json (validators and body digest) in the
+    cache directory. Bodies are streamed to disk rather than held in memory,
+    and a 304 answer serves the stored body without downloading it again.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def entry_path(self, url: str, suffix: str) -> Path:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+        return self.directory / f"{key}{suffix}"
+
+    def _load_meta(self, url: str):
+        meta_path = self.entry_path(url, ".json")
+        body_path = self.entry_path(url, ".body")
+        if not meta_path.exists() or not body_path.exists():
+            return None
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return meta if isinstance(meta, dict) and meta.get("url") == url else None
+
+    def _store(self, url: str, headers, sha256: str | None, previous: dict | None) -> dict:
+        meta = dict(previous or {})
+        meta["url"] = url
+        for header, field in (("ETag", "etag"), ("Last-Modified", "last_modified")):
+            value = headers.get(header)
+            if value:
+                meta[field] = value
+            elif sha256 is not None:
+                meta.pop(field, None)
+        if sha256 is not None:
+            meta["sha256"] = sha256
+        atomic_write_bytes(self.entry_path(url, ".json"), json.dumps(meta, indent=2).encode("utf-8"))
+        return meta
+
+    def fetch(self, pool: ConnectionPool, url: str) -> CachedResponse:
+        previous = self._load_meta(url)
+        headers = {}
+        if previous:
+            if previous.get("etag"):
+                headers["If-None-Match"] = previous["etag"]
+            if previous.get("last_modified"):
+                headers["If-Modified-Since"] = previous["last_modified"]
+        body_path = self.entry_path(url, ".body")
+        try:
+            with pool.open(url, headers=headers) as response:
+                digest = hashlib.sha256()
+                with atomic_open(body_path, "wb") as fp:
+                    while chunk := response.read(READ_CHUNK_SIZE):
+                        digest.update(chunk)
+                        fp.write(chunk)
+                meta = self._store(url, response.headers, digest.hexdigest(), previous)
+                return CachedResponse(url, body_path, meta["sha256"], False)
+        except HTTPError as exc:
+            if exc.code != 304 or not previous:
+                raise
+            meta = self._store(url, exc.headers, None, previous)
+            return CachedResponse(url, body_path, meta["sha256"], True)
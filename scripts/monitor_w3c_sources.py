@@ -1,31 +1,262 @@
 #!/usr/bin/env python3
 import argparse
+import asyncio
+import codecs
+import hashlib
+import http.client
 import json
+import random
+import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from html.parser import HTMLParser
 from pathlib import Path
-from urllib.request import Request, urlopen
 from urllib.error import URLError, HTTPError
+from urllib.parse import urlsplit
 
+import yaml
 
-def fetch_headers(url: str):
-    methods = ["HEAD", "GET"]
-    last_error = None
-    for method in methods:
+from http_pool import ConnectionPool
+from standards_registry import STANDARDS_BY_ID
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+USER_AGENT = "wai-yaml-ld-w3c-monitor/1.0 (+https://github.com/mgifford/wai-yaml-ld)"
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+MAX_RETRY_AFTER_SECONDS = 60
+READ_CHUNK_SIZE = 64 * 1024
+
+# Content fingerprints hash the visible text only: markup, attributes
+# (asset hashes, nonces), comments and the elements below are ignored, and
+# so are words that are timestamps (build times, "generated at" stamps).
+FINGERPRINT_SKIPPED_ELEMENTS = {"script", "style", "noscript", "template"}
+# Section fingerprints split the text at headings. A section is named after
+# the id of the element wrapping its heading (ReSpec <section id=...>), or
+# the heading's own id; text before the first heading is "_preamble".
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+SECTION_CONTAINER_TAGS = {"section", "div", "article"}
+SECTION_DIGEST_LENGTH = 16
+VOLATILE_WORD_RE = re.compile(
+    r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:?\d{2})?|\d{1,2}:\d{2}(:\d{2}(\.\d+)?)?"
+)
+
+
+def request_headers(pool: ConnectionPool, url: str, method: str):
+    headers = {"Range": "bytes=0-0"} if method == "GET" else {}
+    with pool.open(url, method=method, headers=headers) as res:
+        if res.status == 206:
+            res.read()
+        return {
+            "status": res.status,
+            "etag": res.headers.get("ETag"),
+            "last_modified": res.headers.get("Last-Modified"),
+        }
+
+
+class FingerprintParser(HTMLParser):
+    def __init__(self, sections: bool = False):
+        super().__init__(convert_charrefs=True)
+        self.digest = hashlib.sha256()
+        self.section_digests = {} if sections else None
+        self._section = None
+        self._container_id = None
+        self._skip_depth = 0
+        if sections:
+            self._start_section("_preamble")
+
+    def _start_section(self, section_id: str):
+        name = section_id
+        suffix = 1
+        while name in self.section_digests:
+            suffix += 1
+            name = f"{section_id}#{suffix}"
+        self._section = self.section_digests[name] = hashlib.sha256()
+
+    def handle_starttag(self, tag, attrs):
+        if tag in FINGERPRINT_SKIPPED_ELEMENTS:
+            self._skip_depth += 1
+        if self.section_digests is None:
+            return
+        if tag in SECTION_CONTAINER_TAGS:
+            container_id = dict(attrs).get("id")
+            if container_id:
+                self._container_id = container_id
+        elif tag in HEADING_TAGS:
+            self._start_section(self._container_id or dict(attrs).get("id") or f"_{tag}")
+            self._container_id = None
+
+    def sections(self) -> dict[str, str]:
+        return {name: digest.hexdigest()[:SECTION_DIGEST_LENGTH] for name, digest in self.section_digests.items()}
+
+    def handle_endtag(self, tag):
+        if tag in FINGERPRINT_SKIPPED_ELEMENTS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        words = data.split()
+        if words and self._container_id:
+            # Text between a container and the next heading: the container
+            # does not wrap that heading.
+            self._container_id = None
+        for word in words:
+            if not VOLATILE_WORD_RE.fullmatch(word.strip(".,;:()[]")):
+                encoded = word.encode("utf-8") + b" "
+                self.digest.update(encoded)
+                if self._section is not None:
+                    self._section.update(encoded)
+
+
+def content_fingerprint(pool: ConnectionPool, url: str, sections: bool = False):
+    """(sha256 of the page's normalized text, section digests or None), computed while streaming it."""
+    with pool.open(url) as res:
+        if "html" not in (res.headers.get("Content-Type") or "html").lower():
+            digest = hashlib.sha256()
+            while chunk := res.read(READ_CHUNK_SIZE):
+                digest.update(chunk)
+            return digest.hexdigest(), None
+        parser = FingerprintParser(sections)
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        while chunk := res.read(READ_CHUNK_SIZE):
+            parser.feed(decoder.decode(chunk))
+        parser.feed(decoder.decode(b"", final=True))
+        parser.close()
+        return parser.digest.hexdigest(), parser.sections() if sections else None
+
+
+def diff_sections(previous: dict, current: dict) -> list[str]:
+    return sorted(name for name in set(previous) | set(current) if previous.get(name) != current.get(name))
+
+
+def criteria_by_anchor(standard_id: str, repo_root: Path = REPO_ROOT) -> dict[str, str]:
+    """Map URL fragments of a registry standard's normative YAML entries to their codes."""
+    normative = (STANDARDS_BY_ID.get(standard_id) or {}).get("normative")
+    if not normative:
+        return {}
+    path = repo_root / normative["yaml"]
+    if not path.exists():
+        print(f"warning: {path} not found; changed sections of {standard_id} are not mapped to criteria", file=sys.stderr)
+        return {}
+
+    data = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    anchors = {}
+    for value in data.values():
+        if not isinstance(value, list):
+            continue
+        for entry in value:
+            if isinstance(entry, dict) and "#" in str(entry.get("url", "")) and entry.get("code"):
+                anchors[str(entry["url"]).split("#", 1)[1]] = str(entry["code"])
+    return anchors
+
+
+def needs_fingerprint(previous: dict, current: dict, sections: bool = False) -> bool:
+    # Unchanged validators mean unchanged content; only pages whose headers
+    # are missing or changed, or that have no fingerprint yet, are downloaded.
+    if not previous.get("content_sha256"):
+        return True
+    if sections and not previous.get("section_fingerprints"):
+        return True
+    if not current.get("etag") and not current.get("last_modified"):
+        return True
+    return (current.get("etag"), current.get("last_modified")) != (previous.get("etag"), previous.get("last_modified"))
+
+
+def retry_delay(exc, attempt: int, backoff: float):
+    """Seconds to wait before retrying after exc, or None if it is not transient."""
+    if isinstance(exc, HTTPError):
+        if exc.code not in RETRY_STATUSES:
+            return None
+        retry_after = (exc.headers or {}).get("Retry-After", "")
+        if retry_after.strip().isdigit():
+            return min(int(retry_after), MAX_RETRY_AFTER_SECONDS)
+    delay = backoff * 2**attempt
+    return delay + random.uniform(0, delay)
+
+
+async def call_with_retries(func, args, retries: int, backoff: float):
+    """Run func(*args) in a thread, retrying transient errors; returns (result, error)."""
+    for attempt in range(retries + 1):
         try:
-            req = Request(url, method=method)
-            if method == "GET":
-                req.add_header("Range", "bytes=0-0")
-            with urlopen(req, timeout=30) as res:
-                headers = {k.lower(): v for k, v in res.headers.items()}
-                return {
-                    "status": getattr(res, "status", None),
-                    "etag": headers.get("etag"),
-                    "last_modified": headers.get("last-modified"),
-                }
-        except (URLError, HTTPError) as exc:
-            last_error = str(exc)
-    return {"status": None, "etag": None, "last_modified": None, "error": last_error}
+            return await asyncio.to_thread(func, *args), None
+        except ValueError as exc:
+            # Unsupported scheme or malformed URL: retrying cannot help.
+            return None, str(exc)
+        except (URLError, OSError, http.client.HTTPException) as exc:
+            delay = retry_delay(exc, attempt, backoff)
+            if delay is None or attempt == retries:
+                return None, str(exc)
+            await asyncio.sleep(delay)
+
+
+# HEAD, then a one-byte ranged GET for hosts that reject HEAD. Each method is
+# retried with exponential backoff on connection errors and transient
+# statuses while holding one of the host's slots. With fingerprint, the body
+# is also hashed when needs_fingerprint says the stored hash may be stale.
+async def fetch_headers(
+    pool: ConnectionPool,
+    url: str,
+    host_slots: dict,
+    per_host: int,
+    retries: int,
+    backoff: float,
+    previous: dict | None = None,
+    fingerprint: bool = False,
+    sections: bool = False,
+):
+    previous = previous or {}
+    host = (urlsplit(url).hostname or "").lower()
+    slots = host_slots.setdefault(host, asyncio.Semaphore(per_host))
+    last_error = None
+    async with slots:
+        for method in ("HEAD", "GET"):
+            current, last_error = await call_with_retries(request_headers, (pool, url, method), retries, backoff)
+            if current is None:
+                continue
+            if fingerprint:
+                if needs_fingerprint(previous, current, sections):
+                    result, error = await call_with_retries(content_fingerprint, (pool, url, sections), retries, backoff)
+                    current["content_sha256"], current["section_fingerprints"] = result or (None, None)
+                    if error:
+                        current["fingerprint_error"] = error
+                else:
+                    current["content_sha256"] = previous.get("content_sha256")
+                    current["section_fingerprints"] = previous.get("section_fingerprints")
+            current["checked_at"] = datetime.now(timezone.utc).isoformat()
+            return current
+    return {
+        "status": None,
+        "etag": None,
+        "last_modified": None,
+        "error": last_error,
+        "checked_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+async def fetch_all_headers(
+    resources,
+    concurrency: int,
+    per_host: int,
+    retries: int,
+    backoff: float,
+    timeout: float,
+    fingerprint: bool = False,
+    sections: bool = False,
+):
+    # to_thread runs on the loop's default executor, whose size is the global
+    # concurrency limit.
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=max(1, concurrency)))
+    host_slots = {}
+    with ConnectionPool(timeout=timeout, headers={"User-Agent": USER_AGENT}, max_idle_per_host=per_host) as pool:
+        return await asyncio.gather(
+            *(
+                fetch_headers(
+                    pool, resource["url"], host_slots, per_host, retries, backoff, resource, fingerprint, sections
+                )
+                for resource in resources
+            )
+        )
 
 
 def load_watchlist(path: Path):
@@ -39,7 +270,7 @@ def write_watchlist(path: Path, data):
     path.write_text(json.dumps(data, indent=2, sort_keys=False) + "\n")
 
 
-def build_report(resources, changed):
+def build_report(resources, changed, header_only=(), changed_sections=None):
     lines = []
     lines.append("# W3C Source Monitor Report")
     lines.append("")
@@ -66,6 +297,21 @@ def build_report(resources, changed):
         lines.append("")
         for row in changed:
             lines.append(f"- {row.get('id')}")
+    if changed_sections:
+        lines.append("")
+        lines.append("## Changed sections")
+        lines.append("")
+        for resource_id, names, criteria in changed_sections:
+            detail = ", ".join(names)
+            if criteria:
+                detail += f" (criteria: {', '.join(criteria)})"
+            lines.append(f"- {resource_id}: {detail}")
+    if header_only:
+        lines.append("")
+        lines.append("## Header-only changes (content fingerprint unchanged)")
+        lines.append("")
+        for row in header_only:
+            lines.append(f"- {row.get('id')}")
     return "\n".join(lines) + "\n"
 
 
@@ -75,7 +321,24 @@ def main():
     parser.add_argument("--refresh", action="store_true", help="Refresh stored header values")
     parser.add_argument("--check", action="store_true", help="Check for header changes")
     parser.add_argument("--report", help="Write markdown report to this path")
+    parser.add_argument("--concurrency", type=int, default=16, help="Maximum number of requests in flight")
+    parser.add_argument("--per-host", type=int, default=4, help="Maximum concurrent requests to one host")
+    parser.add_argument("--retries", type=int, default=2, help="Retries per request on transient errors")
+    parser.add_argument("--backoff", type=float, default=1.0, help="Base retry delay in seconds (doubles per retry)")
+    parser.add_argument("--timeout", type=float, default=30, help="Per-request timeout in seconds")
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="Store a normalized content hash per resource and use it instead of ETag/Last-Modified to decide changes",
+    )
+    parser.add_argument(
+        "--sections",
+        action="store_true",
+        help="With --fingerprint, also fingerprint each heading section and record the changed section/SC ids",
+    )
     args = parser.parse_args()
+    if args.sections:
+        args.fingerprint = True
 
     if not args.refresh and not args.check:
         parser.error("Specify at least one of --refresh or --check")
@@ -85,19 +348,51 @@ def main():
     resources = data.get("resources", [])
 
     changed = []
+    header_only = []
     report_rows = []
 
-    for resource in resources:
+    fetched = asyncio.run(
+        fetch_all_headers(
+            resources,
+            args.concurrency,
+            args.per_host,
+            args.retries,
+            args.backoff,
+            args.timeout,
+            args.fingerprint,
+            args.sections,
+        )
+    )
+    changed_sections = []
+
+    for resource, current in zip(resources, fetched):
         prev_etag = resource.get("etag")
         prev_last_modified = resource.get("last_modified")
+        prev_fingerprint = resource.get("content_sha256")
+        fingerprint = current.get("content_sha256")
+        prev_sections = resource.get("section_fingerprints")
+        if fingerprint:
+            resource["content_sha256"] = fingerprint
+        if args.sections and current.get("section_fingerprints"):
+            resource["section_fingerprints"] = current["section_fingerprints"]
+            if prev_sections and prev_fingerprint and prev_fingerprint != fingerprint:
+                names = diff_sections(prev_sections, current["section_fingerprints"])
+                anchors = criteria_by_anchor(resource.get("id", ""))
+                criteria = sorted({anchors[name] for name in names if name in anchors})
+                resource["changed_sections"] = names
+                resource["changed_criteria"] = criteria
+                changed_sections.append((resource.get("id"), names, criteria))
+            elif fingerprint:
+                resource.pop("changed_sections", None)
+                resource.pop("changed_criteria", None)
 
-        current = fetch_headers(resource["url"])
         resource["status"] = current.get("status")
         resource["etag"] = current.get("etag")
         resource["last_modified"] = current.get("last_modified")
-        resource["checked_at"] = datetime.now(timezone.utc).isoformat()
-        if current.get("error"):
-            resource["last_error"] = current["error"]
+        resource["checked_at"] = current["checked_at"]
+        error = current.get("error") or current.get("fingerprint_error")
+        if error:
+            resource["last_error"] = error
         else:
             resource.pop("last_error", None)
 
@@ -113,7 +408,12 @@ def main():
 
         etag_changed = prev_etag and resource.get("etag") and prev_etag != resource.get("etag")
         lm_changed = prev_last_modified and resource.get("last_modified") and prev_last_modified != resource.get("last_modified")
-        if etag_changed or lm_changed:
+        if args.fingerprint and prev_fingerprint and fingerprint:
+            if prev_fingerprint != fingerprint:
+                changed.append(row)
+            elif etag_changed or lm_changed:
+                header_only.append(row)
+        elif etag_changed or lm_changed:
             changed.append(row)
 
     data["updated"] = datetime.now(timezone.utc).isoformat()
@@ -124,9 +424,12 @@ def main():
     if args.report:
         report_path = Path(args.report)
         report_path.parent.mkdir(parents=True, exist_ok=True)
-        report_path.write_text(build_report(report_rows, changed))
+        report_path.write_text(build_report(report_rows, changed, header_only, changed_sections))
 
-    print(f"checked={len(resources)} changed={len(changed)}")
+    if args.fingerprint:
+        print(f"checked={len(resources)} changed={len(changed)} header_only={len(header_only)}")
+    else:
+        print(f"checked={len(resources)} changed={len(changed)}")
 
     if args.check and changed:
         return 2
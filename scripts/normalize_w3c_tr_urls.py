@@ -9,6 +9,8 @@ from urllib.parse import urlparse, urlunparse
 URL_RE = re.compile(r"https?://[^\s<>'\")\]]+")
 TR_DATED_PATH_RE = re.compile(r"^/TR/(?P<year>\d{4})/(?P<snapshot>[^/]+)/?$")
 SNAPSHOT_TOKEN_RE = re.compile(r"^(?:(?:WD|CRD|CR|PR|PER|REC|NOTE)-)?(?P<shortname>.+?)-(?P<date>\d{8})$")
+# Every rewritable URL contains this, so files without it are not scanned.
+TR_URL_MARKER = "www.w3.org/TR/"
 
 
 @dataclass
@@ -17,6 +19,14 @@ class Candidate:
     canonical: str
 
 
+@dataclass
+class ScannedFile:
+    path: Path
+    text: str
+    # (start, end, url) of each dated TR URL in text, in order.
+    spans: list[tuple[int, int, str]]
+
+
 def expand_inputs(includes: list[str]) -> list[Path]:
     files: list[Path] = []
     seen: set[Path] = set()
@@ -28,11 +38,27 @@ def expand_inputs(includes: list[str]) -> list[Path]:
     return files
 
 
-def extract_urls(text: str) -> set[str]:
-    found: set[str] = set()
-    for raw in URL_RE.findall(text):
-        found.add(raw.rstrip('.,;:`'))
-    return found
+def scan_file(path: Path, candidates: dict[str, Candidate | None]) -> ScannedFile | None:
+    """Read a file once and record where its rewritable URLs are.
+
+    Returns None for files without dated TR URLs; only files with spans keep
+    their text for the rewrite.
+    """
+    text = path.read_text(encoding="utf-8", errors="replace")
+    if TR_URL_MARKER not in text:
+        return None
+    spans: list[tuple[int, int, str]] = []
+    for match in URL_RE.finditer(text):
+        url = match.group(0).rstrip('.,;:`')
+        if url not in candidates:
+            candidates[url] = build_canonical_url(url)
+        candidate = candidates[url]
+        if candidate and candidate.original != candidate.canonical:
+            start = match.start()
+            spans.append((start, start + len(url), url))
+    if not spans:
+        return None
+    return ScannedFile(path=path, text=text, spans=spans)
 
 
 def infer_shortname(snapshot: str) -> str | None:
@@ -86,19 +112,20 @@ def check_url_exists(url: str, timeout: int) -> bool:
         return False
 
 
-def replace_urls_in_text(text: str, replacements: dict[str, str]) -> str:
-    if not replacements:
+def splice_urls(text: str, spans: list[tuple[int, int, str]], replacements: dict[str, str]) -> str:
+    parts: list[str] = []
+    position = 0
+    for start, end, url in spans:
+        canonical = replacements.get(url)
+        if canonical is None:
+            continue
+        parts.append(text[position:start])
+        parts.append(canonical)
+        position = end
+    if not parts:
         return text
-
-    def repl(match: re.Match[str]) -> str:
-        raw = match.group(0)
-        stripped = raw.rstrip('.,;:`')
-        suffix = raw[len(stripped):]
-        if stripped in replacements:
-            return replacements[stripped] + suffix
-        return raw
-
-    return URL_RE.sub(repl, text)
+    parts.append(text[position:])
+    return "".join(parts)
 
 
 def write_report(report: Path, changed_files: list[Path], replaced: list[Candidate], skipped: list[str]) -> None:
@@ -146,17 +173,15 @@ def main() -> None:
     if not files:
         raise SystemExit("no files matched include patterns")
 
-    all_urls: set[str] = set()
-    for file_path in files:
-        text = file_path.read_text(encoding="utf-8", errors="replace")
-        all_urls.update(extract_urls(text))
+    candidates: dict[str, Candidate | None] = {}
+    scanned = [item for item in (scan_file(file_path, candidates) for file_path in files) if item]
 
     replacements: dict[str, str] = {}
     replaced_candidates: list[Candidate] = []
     skipped_candidates: list[str] = []
 
-    for url in sorted(all_urls):
-        candidate = build_canonical_url(url)
+    for url in sorted(candidates):
+        candidate = candidates[url]
         if not candidate:
             continue
         if candidate.original == candidate.canonical:
@@ -172,12 +197,11 @@ def main() -> None:
             skipped_candidates.append(f"{candidate.original} (canonical unresolved: {candidate.canonical})")
 
     changed_files: list[Path] = []
-    for file_path in files:
-        original = file_path.read_text(encoding="utf-8", errors="replace")
-        updated = replace_urls_in_text(original, replacements)
-        if updated != original:
-            file_path.write_text(updated, encoding="utf-8")
-            changed_files.append(file_path)
+    for item in scanned:
+        updated = splice_urls(item.text, item.spans, replacements)
+        if updated != item.text:
+            item.path.write_text(updated, encoding="utf-8")
+            changed_files.append(item.path)
 
     write_report(Path(args.report), changed_files, replaced_candidates, skipped_candidates)
 
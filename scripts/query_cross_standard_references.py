@@ -2,16 +2,36 @@
 import argparse
 import csv
 import json
+import os
+import signal
+import socketserver
+import sys
+from bisect import bisect_left
 from pathlib import Path
 
 import yaml
 
+from cross_reference_links import LINK_FIELDNAMES, Link, links_from_records
+from cross_reference_snapshot import Snapshot, load_snapshot_links, write_snapshot
+from http_pool import atomic_write_text
+
+INDEX_VERSION = 2
+INDEXED_FIELDS = [
+    "source_standard_id",
+    "source_criterion_code",
+    "target_standard_id",
+    "target_criterion_code",
+    "relation_type",
+    "basis",
+]
+INTRA_RELATION = "direct_sc_reference_intra_standard"
+
 
 def load_links(path: Path):
     data = yaml.safe_load(path.read_text(encoding="utf-8"))
     if not isinstance(data, dict) or not isinstance(data.get("links"), list):
         raise ValueError(f"{path} must contain a YAML object with a 'links' list")
-    return data.get("links", [])
+    return links_from_records(data["links"])
 
 
 def matches(value: str, expected: str) -> bool:
@@ -30,24 +50,286 @@ def filter_links(
 ):
     out = []
     for item in links:
-        if source_standard and not matches(item.get("source_standard_id", ""), source_standard):
+        if source_standard and not matches(item.source_standard_id, source_standard):
             continue
-        if source_sc and not matches(item.get("source_criterion_code", ""), source_sc):
+        if source_sc and not matches(item.source_criterion_code, source_sc):
             continue
-        if target_standard and not matches(item.get("target_standard_id", ""), target_standard):
+        if target_standard and not matches(item.target_standard_id, target_standard):
             continue
-        if target_sc and not matches(item.get("target_criterion_code", ""), target_sc):
+        if target_sc and not matches(item.target_criterion_code, target_sc):
             continue
-        if relation_types and str(item.get("relation_type", "")) not in relation_types:
+        if relation_types and item.relation_type not in relation_types:
             continue
-        if basis and not matches(item.get("basis", ""), basis):
+        if basis and not matches(item.basis, basis):
             continue
-        if not include_intra and str(item.get("relation_type", "")) == "direct_sc_reference_intra_standard":
+        if not include_intra and item.relation_type == INTRA_RELATION:
             continue
         out.append(item)
     return out
 
 
+def filter_snapshot(
+    snapshot: Snapshot,
+    source_standard: str,
+    source_sc: str,
+    target_standard: str,
+    target_sc: str,
+    relation_types: list[str],
+    basis: str,
+    include_intra: bool,
+):
+    checks = []
+    for field, expected in (
+        ("source_standard_id", source_standard),
+        ("source_criterion_code", source_sc),
+        ("target_standard_id", target_standard),
+        ("target_criterion_code", target_sc),
+        ("basis", basis),
+    ):
+        if expected:
+            wanted = {code for code, value in enumerate(snapshot.dictionary(field)) if matches(value, expected)}
+            checks.append((snapshot.codes(field), wanted))
+    if relation_types or not include_intra:
+        wanted = {
+            code
+            for code, value in enumerate(snapshot.dictionary("relation_type"))
+            if (not relation_types or value in relation_types) and (include_intra or value != INTRA_RELATION)
+        }
+        checks.append((snapshot.codes("relation_type"), wanted))
+
+    if any(not wanted for _, wanted in checks):
+        return []
+    positions = [
+        position
+        for position in range(len(snapshot))
+        if all(codes[position] in wanted for codes, wanted in checks)
+    ]
+    return [Link.from_dict(row) for row in snapshot.rows_at(positions)]
+
+
+def index_key(field: str, value) -> str:
+    # relation_type is compared without stripping in filter_links.
+    if field == "relation_type":
+        return str(value)
+    return str(value).strip()
+
+
+def dataset_fingerprint(path: Path):
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def index_rows_path(index_path: Path) -> Path:
+    return index_path.with_name(index_path.name + ".rows.snapshot")
+
+
+def build_index(links, dataset_path: Path):
+    postings = {field: {} for field in INDEXED_FIELDS}
+    for position, item in enumerate(links):
+        for field in INDEXED_FIELDS:
+            postings[field].setdefault(index_key(field, getattr(item, field)), []).append(position)
+    return {
+        "index_version": INDEX_VERSION,
+        "dataset": dataset_fingerprint(dataset_path),
+        "row_count": len(links),
+        "postings": postings,
+        "links": links,
+    }
+
+
+def write_index(path: Path, index):
+    payload = {key: value for key, value in index.items() if key not in ("links", "rows_path")}
+    atomic_write_text(path, json.dumps(payload, ensure_ascii=False, separators=(",", ":")))
+
+
+def load_index(index_path: Path, dataset_path: Path, read_links=load_links, rows_path: Path | None = None):
+    """Load the posting lists for dataset_path, rebuilding them when stale.
+
+    The index holds row positions only. Matching rows are decoded from the
+    snapshot at rows_path: the dataset itself when it is a snapshot,
+    otherwise a snapshot of the dataset rows written next to the index.
+    """
+    if rows_path is None:
+        rows_path = index_rows_path(index_path)
+    if index_path.exists():
+        try:
+            index = json.loads(index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            index = None
+        if (
+            isinstance(index, dict)
+            and index.get("index_version") == INDEX_VERSION
+            and index.get("dataset") == dataset_fingerprint(dataset_path)
+            and (rows_path == dataset_path or rows_path.exists() and index.get("rows") == dataset_fingerprint(rows_path))
+        ):
+            index["rows_path"] = rows_path
+            return index
+
+    links = read_links(dataset_path)
+    index = build_index(links, dataset_path)
+    if rows_path != dataset_path:
+        write_snapshot(rows_path, (link.to_dict() for link in links), LINK_FIELDNAMES)
+        index["rows"] = dataset_fingerprint(rows_path)
+    index["rows_path"] = rows_path
+    write_index(index_path, index)
+    return index
+
+
+def index_links(index, positions):
+    """Return the links at positions, from memory or the index row snapshot."""
+    links = index.get("links")
+    if links is not None:
+        return [links[position] for position in positions]
+    with Snapshot(index["rows_path"]) as snapshot:
+        return [Link.from_dict(row) for row in snapshot.rows_at(positions)]
+
+
+def intersect_postings(postings: list[list[int]]) -> list[int]:
+    postings = sorted(postings, key=len)
+    result = postings[0]
+    for other in postings[1:]:
+        out = []
+        lo = 0
+        for position in result:
+            lo = bisect_left(other, position, lo)
+            if lo == len(other):
+                break
+            if other[lo] == position:
+                out.append(position)
+        result = out
+        if not result:
+            break
+    return result
+
+
+def query_index(
+    index,
+    source_standard: str,
+    source_sc: str,
+    target_standard: str,
+    target_sc: str,
+    relation_types: list[str],
+    basis: str,
+    include_intra: bool,
+):
+    """Return the row positions matching the filters, in dataset order."""
+    postings = index["postings"]
+    selected = []
+    for field, expected in (
+        ("source_standard_id", source_standard),
+        ("source_criterion_code", source_sc),
+        ("target_standard_id", target_standard),
+        ("target_criterion_code", target_sc),
+        ("basis", basis),
+    ):
+        if expected:
+            selected.append(postings[field].get(index_key(field, expected), []))
+    if relation_types:
+        by_relation = postings["relation_type"]
+        merged = set()
+        for relation in relation_types:
+            merged.update(by_relation.get(relation, []))
+        selected.append(sorted(merged))
+
+    positions = intersect_postings(selected) if selected else range(index["row_count"])
+    if include_intra:
+        return list(positions)
+    excluded = set(postings["relation_type"].get(INTRA_RELATION, []))
+    return [position for position in positions if position not in excluded]
+
+
+def _spec_text(spec, key: str) -> str:
+    # A JSON null means the same as an absent filter.
+    value = spec.get(key)
+    return "" if value is None else str(value)
+
+
+def run_filter_spec(index, spec):
+    if not isinstance(spec, dict):
+        raise ValueError("filter spec must be a JSON object")
+    relation_types = spec.get("relation_types")
+    if relation_types is None:
+        relation_types = []
+    elif isinstance(relation_types, str):
+        relation_types = [relation_types]
+    if not isinstance(relation_types, list):
+        raise ValueError("relation_types must be a string or a list")
+    include_intra = spec.get("include_intra")
+    if include_intra is None:
+        include_intra = False
+    if not isinstance(include_intra, bool):
+        raise ValueError("include_intra must be true or false")
+    limit = spec.get("limit")
+    if limit is None:
+        limit = 0
+    if isinstance(limit, bool) or not isinstance(limit, int):
+        raise ValueError("limit must be an integer")
+    positions = query_index(
+        index,
+        source_standard=_spec_text(spec, "source_standard"),
+        source_sc=_spec_text(spec, "source_sc"),
+        target_standard=_spec_text(spec, "target_standard"),
+        target_sc=_spec_text(spec, "target_sc"),
+        relation_types=[str(item) for item in relation_types],
+        basis=_spec_text(spec, "basis"),
+        include_intra=include_intra,
+    )
+    rows = index_links(index, positions[:limit] if limit > 0 else positions)
+    return {"matches": len(positions), "links": [link.to_dict() for link in rows]}
+
+
+def handle_request(index, line: str) -> str:
+    request = None
+    try:
+        request = json.loads(line)
+        if isinstance(request, dict) and "batch" in request:
+            batch = request["batch"]
+            if not isinstance(batch, list):
+                raise ValueError("batch must be a list of filter specs")
+            response = {"results": [run_filter_spec(index, spec) for spec in batch]}
+        else:
+            response = run_filter_spec(index, request)
+    except (ValueError, TypeError) as exc:
+        response = {"error": str(exc)}
+    if isinstance(request, dict) and "id" in request:
+        response["id"] = request["id"]
+    return json.dumps(response, ensure_ascii=False)
+
+
+def serve_stream(index, reader, writer):
+    for line in reader:
+        if not line.strip():
+            continue
+        writer.write(handle_request(index, line) + "\n")
+        writer.flush()
+
+
+def serve_socket(index, socket_path: Path):
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for raw in self.rfile:
+                line = raw.decode("utf-8", errors="replace")
+                if not line.strip():
+                    continue
+                self.wfile.write((handle_request(index, line) + "\n").encode("utf-8"))
+                self.wfile.flush()
+
+    if socket_path.exists():
+        socket_path.unlink()
+    server = socketserver.ThreadingUnixStreamServer(str(socket_path), Handler)
+    server.daemon_threads = True
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"serving on {socket_path}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if socket_path.exists():
+            os.unlink(socket_path)
+
+
 def print_table(links, limit: int):
     rows = links[:limit] if limit > 0 else links
     if not rows:
@@ -66,60 +348,32 @@ def print_table(links, limit: int):
     ]
     print("\t".join(header))
     for item in rows:
-        print(
-            "\t".join(
-                [
-                    str(item.get("link_id", "")),
-                    str(item.get("relation_type", "")),
-                    str(item.get("basis", "")),
-                    str(item.get("source_standard_id", "")),
-                    str(item.get("source_criterion_code", "")),
-                    str(item.get("source_resource_id", "")),
-                    str(item.get("target_standard_id", "")),
-                    str(item.get("target_criterion_code", "")),
-                    str(item.get("target_profile_ref", "")),
-                ]
-            )
-        )
+        print("\t".join(getattr(item, field) for field in header))
 
 
 def print_json(links, limit: int):
     rows = links[:limit] if limit > 0 else links
-    print(json.dumps(rows, indent=2, ensure_ascii=False))
+    print(json.dumps([link.to_dict() for link in rows], indent=2, ensure_ascii=False))
 
 
 def write_csv(path: Path, links, limit: int):
     rows = links[:limit] if limit > 0 else links
-    fieldnames = [
-        "link_id",
-        "relation_type",
-        "basis",
-        "confidence",
-        "source_kind",
-        "source_standard_id",
-        "source_criterion_id",
-        "source_criterion_code",
-        "source_criterion_title",
-        "source_resource_id",
-        "source_url",
-        "target_standard_id",
-        "target_criterion_code",
-        "target_profile_ref",
-        "target_url",
-        "evidence_excerpt",
-        "source_dataset",
-    ]
     path.parent.mkdir(parents=True, exist_ok=True)
     with path.open("w", encoding="utf-8", newline="") as fp:
-        writer = csv.DictWriter(fp, fieldnames=fieldnames)
+        writer = csv.DictWriter(fp, fieldnames=LINK_FIELDNAMES)
         writer.writeheader()
-        writer.writerows(rows)
+        writer.writerows(link.to_dict() for link in rows)
     print(str(path))
 
 
 def main():
     parser = argparse.ArgumentParser(description="Query cross-standard reference links")
-    parser.add_argument("--dataset-yaml", required=True)
+    parser.add_argument("--dataset-yaml", default="")
+    parser.add_argument(
+        "--dataset-snapshot",
+        default="",
+        help="Read links from a columnar snapshot written by generate_cross_standard_references.py --out-snapshot",
+    )
     parser.add_argument("--source-standard", default="")
     parser.add_argument("--source-sc", default="")
     parser.add_argument("--target-standard", default="")
@@ -130,11 +384,58 @@ def main():
     parser.add_argument("--format", choices=["table", "json", "csv"], default="table")
     parser.add_argument("--out-csv", default="")
     parser.add_argument("--limit", type=int, default=0)
+    parser.add_argument(
+        "--index",
+        default="",
+        help="Path to a JSON query index; built from the dataset when missing or stale",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Load the dataset once and answer newline-delimited JSON filter requests",
+    )
+    parser.add_argument(
+        "--socket",
+        default="",
+        help="With --serve, listen on this Unix socket instead of stdin/stdout",
+    )
     args = parser.parse_args()
 
-    links = load_links(Path(args.dataset_yaml))
-    filtered = filter_links(
-        links,
+    if args.dataset_snapshot:
+        dataset_path = Path(args.dataset_snapshot)
+        read_links = load_snapshot_links
+        rows_path = dataset_path
+    elif args.dataset_yaml:
+        dataset_path = Path(args.dataset_yaml)
+        read_links = load_links
+        rows_path = None
+    else:
+        parser.error("Specify --dataset-yaml or --dataset-snapshot")
+
+    if args.serve:
+        if args.index:
+            index = load_index(Path(args.index), dataset_path, read_links, rows_path)
+        else:
+            index = build_index(read_links(dataset_path), dataset_path)
+        print(f"loaded links={index['row_count']}", file=sys.stderr)
+        if args.socket:
+            serve_socket(index, Path(args.socket))
+        else:
+            serve_stream(index, sys.stdin, sys.stdout)
+        return
+
+    if args.index:
+        search = query_index
+        source = load_index(Path(args.index), dataset_path, read_links, rows_path)
+    elif args.dataset_snapshot:
+        search = filter_snapshot
+        source = Snapshot(dataset_path)
+    else:
+        search = filter_links
+        source = load_links(dataset_path)
+
+    filtered = search(
+        source,
         source_standard=args.source_standard,
         source_sc=args.source_sc,
         target_standard=args.target_standard,
@@ -145,6 +446,9 @@ def main():
     )
 
     print(f"matches={len(filtered)}")
+    if args.index:
+        # Only the rows that are printed are decoded from the row snapshot.
+        filtered = index_links(source, filtered[: args.limit] if args.limit > 0 else filtered)
 
     if args.format == "table":
         print_table(filtered, args.limit)
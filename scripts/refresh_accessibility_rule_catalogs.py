@@ -1,15 +1,19 @@
 #!/usr/bin/env python3
 import argparse
-import html
+import codecs
 import json
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from html.parser import HTMLParser
 from pathlib import Path
-from urllib.parse import urljoin
-from urllib.request import Request, urlopen
+from urllib.parse import urljoin, urlsplit
 
 import yaml
 
+from http_pool import ConnectionPool, ResponseCache, atomic_write_text
+from rule_catalog_history import CatalogHistory
+
 
 ACT_INDEX_URL = "https://www.w3.org/WAI/standards-guidelines/act/rules/"
 AXE_INDEX_URL = "https://dequeuniversity.com/rules/axe/html/4.11"
@@ -17,37 +21,100 @@ ALFA_INDEX_URL = "https://alfa.siteimprove.com/rules"
 IBM_CHECKER_RULESETS_URL = "https://www.ibm.com/able/requirements/checker-rule-sets/"
 QUALWEB_REPO_URL = "https://github.com/qualweb/act-rules"
 QUALWEB_RULES_API_URL = "https://api.github.com/repos/qualweb/act-rules/contents/src/rules?ref=master"
-
-
-def fetch_text(url: str) -> str:
-    req = Request(url, headers={"User-Agent": "wai-yaml-ld-rule-refresh/1.0"})
-    with urlopen(req, timeout=60) as response:
-        return response.read().decode("utf-8", errors="replace")
-
-
-def fetch_json(url: str):
-    req = Request(url, headers={"User-Agent": "wai-yaml-ld-rule-refresh/1.0"})
-    with urlopen(req, timeout=60) as response:
-        return json.loads(response.read().decode("utf-8", errors="replace"))
-
-
-def clean_text(value: str) -> str:
-    stripped = re.sub(r"<[^>]+>", " ", value)
-    unescaped = html.unescape(stripped)
-    return re.sub(r"\s+", " ", unescaped).strip()
-
-
-def extract_act_rules(html: str):
-    anchors = re.findall(r'<a[^>]+href=["\']([^"\']+)["\'][^>]*>(.*?)</a>', html, flags=re.IGNORECASE | re.DOTALL)
+USER_AGENT = "wai-yaml-ld-rule-refresh/1.0"
+FETCH_TIMEOUT = 60
+# Bump when an extractor changes so cached extraction results are redone.
+EXTRACTION_VERSION = 2
+READ_CHUNK_SIZE = 64 * 1024
+
+ACT_RULE_URL_RE = re.compile(r"^https://www\.w3\.org/WAI/standards-guidelines/act/rules/([a-z0-9]{6})/(proposed/)?$")
+AXE_RULE_URL_RE = re.compile(r"^https://dequeuniversity\.com/rules/axe/4\.11/([a-z0-9-]+)$", flags=re.IGNORECASE)
+ALFA_RULE_HREF_RE = re.compile(r"/rules/sia-r[0-9]+", flags=re.IGNORECASE)
+ALFA_TITLE_PREFIX_RE = re.compile(r"^SIA-R[0-9]+\s*", flags=re.IGNORECASE)
+
+
+def mirror_source_url(url: str, mirror_url: str) -> str:
+    # A mirror serves each source under <mirror>/<host>/<path>, e.g. a local
+    # http.server over recorded pages for offline runs.
+    if not mirror_url:
+        return url
+    parts = urlsplit(url)
+    mirrored = f"{mirror_url.rstrip('/')}/{parts.netloc}{parts.path}"
+    return f"{mirrored}?{parts.query}" if parts.query else mirrored
+
+
+def stream_text(fp):
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    while chunk := fp.read(READ_CHUNK_SIZE):
+        yield decoder.decode(chunk)
+    yield decoder.decode(b"", final=True)
+
+
+def load_json(fp):
+    return json.loads(fp.read().decode("utf-8", errors="replace"))
+
+
+class AnchorParser(HTMLParser):
+    """Collect (href, text) for every <a href> element.
+
+    The text has entities decoded, nested tags replaced by spaces and
+    whitespace collapsed.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.anchors = []
+        self._href = None
+        self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        if self._href is not None:
+            self._text.append(" ")
+            return
+        if tag == "a":
+            href = dict(attrs).get("href")
+            if href:
+                self._href = href
+                self._text = []
+
+    def handle_endtag(self, tag):
+        if self._href is None:
+            return
+        if tag != "a":
+            self._text.append(" ")
+            return
+        self.anchors.append((self._href, " ".join("".join(self._text).split())))
+        self._href = None
+
+    def handle_data(self, data):
+        if self._href is not None:
+            self._text.append(data)
+
+
+# Feeds the page to the parser chunk by chunk, so a page never has to be held
+# in memory as one string. Accepts a string or an iterable of text chunks.
+def iter_anchors(chunks):
+    if isinstance(chunks, str):
+        chunks = (chunks,)
+    parser = AnchorParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+        if parser.anchors:
+            yield from parser.anchors
+            parser.anchors.clear()
+    parser.close()
+    yield from parser.anchors
+
+
+def extract_act_rules(html):
     seen = {}
-    for href, label in anchors:
+    for href, title in iter_anchors(html):
         absolute = urljoin(ACT_INDEX_URL, href)
-        match = re.match(r"^https://www\.w3\.org/WAI/standards-guidelines/act/rules/([a-z0-9]{6})/(proposed/)?$", absolute)
+        match = ACT_RULE_URL_RE.match(absolute)
         if not match:
             continue
         rule_id = match.group(1)
         status = "proposed" if match.group(2) else "approved"
-        title = clean_text(label)
 
         existing = seen.get(rule_id)
         if existing and existing.get("status") == "approved" and status == "proposed":
@@ -64,17 +131,15 @@ def extract_act_rules(html: str):
     return [seen[key] for key in sorted(seen.keys())]
 
 
-def extract_axe_rules(html: str):
-    anchors = re.findall(r'<a[^>]+href=["\']([^"\']+)["\'][^>]*>(.*?)</a>', html, flags=re.IGNORECASE | re.DOTALL)
+def extract_axe_rules(html):
     seen = {}
-    for href, label in anchors:
+    for href, title in iter_anchors(html):
         absolute = urljoin(AXE_INDEX_URL, href)
-        match = re.match(r"^https://dequeuniversity\.com/rules/axe/4\.11/([a-z0-9-]+)$", absolute, flags=re.IGNORECASE)
+        match = AXE_RULE_URL_RE.match(absolute)
         if not match:
             continue
 
         rule_id = match.group(1).lower()
-        title = clean_text(label)
         if title.lower().startswith(rule_id):
             title = title[len(rule_id):].strip(" :-")
 
@@ -90,13 +155,13 @@ def extract_axe_rules(html: str):
     return [seen[key] for key in sorted(seen.keys())]
 
 
-def extract_alfa_rules(html: str):
-    anchors = re.findall(r'<a[^>]+href=["\'](/rules/sia-r[0-9]+)["\'][^>]*>(.*?)</a>', html, flags=re.IGNORECASE | re.DOTALL)
+def extract_alfa_rules(html):
     seen = {}
-    for href, label in anchors:
+    for href, title in iter_anchors(html):
+        if not ALFA_RULE_HREF_RE.fullmatch(href):
+            continue
         rule_id = href.rsplit("/", 1)[-1].lower()
-        title = clean_text(label)
-        title = re.sub(r"^SIA-R[0-9]+\s*", "", title, flags=re.IGNORECASE).strip(" :-")
+        title = ALFA_TITLE_PREFIX_RE.sub("", title).strip(" :-")
 
         payload = {
             "id": rule_id,
@@ -110,8 +175,7 @@ def extract_alfa_rules(html: str):
     return [seen[key] for key in sorted(seen.keys(), key=lambda value: int(value.split("r", 1)[1]))]
 
 
-def extract_qualweb_rules():
-    items = fetch_json(QUALWEB_RULES_API_URL)
+def extract_qualweb_rules(items):
     rules = []
 
     for item in items:
@@ -133,6 +197,61 @@ def extract_qualweb_rules():
     return sorted(rules, key=lambda rule: int(rule["id"].split("R", 1)[1]))
 
 
+# Sources are fetched concurrently, so a refresh takes as long as the slowest
+# source rather than the sum of all of them.
+SOURCES = {
+    "act": (ACT_INDEX_URL, stream_text, extract_act_rules),
+    "axe": (AXE_INDEX_URL, stream_text, extract_axe_rules),
+    "alfa": (ALFA_INDEX_URL, stream_text, extract_alfa_rules),
+    "qualweb": (QUALWEB_RULES_API_URL, load_json, extract_qualweb_rules),
+}
+
+
+def cached_extraction(path: Path, body_sha256: str):
+    try:
+        stored = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(stored, dict):
+        return None
+    if stored.get("version") != EXTRACTION_VERSION or stored.get("body_sha256") != body_sha256:
+        return None
+    return stored.get("rules")
+
+
+# Returns (rules, status). With a response cache, a 304 answer or an
+# unchanged body reuses the rules extracted from that body last time.
+def refresh_source(pool: ConnectionPool, name: str, mirror_url: str = "", cache: ResponseCache | None = None):
+    url, decode, extract = SOURCES[name]
+    fetch_url = mirror_source_url(url, mirror_url)
+    if cache is None:
+        with pool.open(fetch_url) as response:
+            return extract(decode(response)), "fetched"
+
+    response = cache.fetch(pool, fetch_url)
+    status = "not_modified" if response.not_modified else "fetched"
+    extraction_path = cache.entry_path(fetch_url, ".rules.json")
+    rules = cached_extraction(extraction_path, response.sha256)
+    if rules is not None:
+        return rules, status if response.not_modified else "unchanged"
+
+    with response.open() as fp:
+        rules = extract(decode(fp))
+    atomic_write_text(
+        extraction_path,
+        json.dumps({"version": EXTRACTION_VERSION, "body_sha256": response.sha256, "rules": rules}),
+    )
+    return rules, status
+
+
+def refresh_sources(mirror_url: str = "", cache_dir: str = ""):
+    cache = ResponseCache(cache_dir) if cache_dir else None
+    with ConnectionPool(timeout=FETCH_TIMEOUT, headers={"User-Agent": USER_AGENT}) as pool:
+        with ThreadPoolExecutor(max_workers=len(SOURCES)) as executor:
+            futures = {name: executor.submit(refresh_source, pool, name, mirror_url, cache) for name in SOURCES}
+            return {name: future.result() for name, future in futures.items()}
+
+
 def build_catalog(act_rules, axe_rules, alfa_rules, qualweb_rules):
     today = datetime.now(timezone.utc).date().isoformat()
     return {
@@ -206,12 +325,28 @@ def main():
         default="kitty-specs/001-wai-standards-yaml-ld-ingestion/research/accessibility-rule-catalogs.yaml",
         help="Path to output YAML file",
     )
+    parser.add_argument(
+        "--mirror-url",
+        default="",
+        help="Fetch every source from <mirror-url>/<host>/<path> instead (offline runs against recorded pages)",
+    )
+    parser.add_argument(
+        "--http-cache",
+        default="",
+        help="Directory for cached responses; sources are revalidated with ETag/Last-Modified and unchanged ones are not re-extracted",
+    )
+    parser.add_argument(
+        "--history",
+        default="",
+        help="Append the refreshed catalog to this delta-encoded history (see rule_catalog_history.py)",
+    )
     args = parser.parse_args()
 
-    act_rules = extract_act_rules(fetch_text(ACT_INDEX_URL))
-    axe_rules = extract_axe_rules(fetch_text(AXE_INDEX_URL))
-    alfa_rules = extract_alfa_rules(fetch_text(ALFA_INDEX_URL))
-    qualweb_rules = extract_qualweb_rules()
+    extracted = refresh_sources(args.mirror_url, args.http_cache)
+    act_rules, _ = extracted["act"]
+    axe_rules, _ = extracted["axe"]
+    alfa_rules, _ = extracted["alfa"]
+    qualweb_rules, _ = extracted["qualweb"]
 
     if not act_rules:
         raise SystemExit("No ACT rules extracted; refusing to overwrite output")
@@ -226,12 +361,17 @@ def main():
     output_path = Path(args.out_yaml)
     output_path.parent.mkdir(parents=True, exist_ok=True)
     output_path.write_text(yaml.safe_dump(catalog, sort_keys=False, allow_unicode=True))
+    if args.history:
+        CatalogHistory(args.history).append(catalog)
 
     print(
         f"act_rules={len(act_rules)} axe_rules={len(axe_rules)} "
         f"alfa_rules={len(alfa_rules)} qualweb_rules={len(qualweb_rules)}"
     )
+    print(" ".join(f"{name}_source={status}" for name, (_, status) in extracted.items()))
     print(f"out={output_path}")
+    if args.history:
+        print(f"history={args.history}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""Delta-encoded history of the accessibility rule catalog refreshes.
+
+The history is a JSON Lines file with one record per refresh, in date order.
+Each record is the delta from the previous catalog:
+
+    {"date": "2026-04-01", "keyframe": false,
+     "fields": {...}, "removed_fields": [...],
+     "rule_sets": {"<set id>": {"fields": {...}, "removed_fields": [...],
+                                "added": [rule, ...], "removed": [rule id, ...],
+                                "changed": [rule, ...]}},
+     "removed_sets": [...]}
+
+Changed rules (retitled, new URL or status) are stored whole. "key_order",
+"set_order" and per-set "order" are only present when applying the delta
+would not reproduce the catalog's own ordering, and a rule set whose rule ids
+are not unique is stored whole as "rules". Every KEYFRAME_INTERVAL-th record
+is a keyframe holding the full "catalog" instead of a delta:
+
+    {"date": "2026-04-01", "keyframe": true, "catalog": {...}}
+
+so reconstructing a date reads one keyframe and applies at most
+KEYFRAME_INTERVAL - 1 deltas.
+"""
+import argparse
+import bisect
+import copy
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import yaml
+
+DEFAULT_HISTORY = "kitty-specs/001-wai-standards-yaml-ld-ingestion/research/derived/accessibility-rule-catalogs.history.jsonl"
+KEYFRAME_INTERVAL = 50
+
+_RECORD_HEADER = re.compile(r'^\{"date": "([^"]*)", "keyframe": (true|false)')
+
+
+# Both the unchanged check and the written records use this, so values YAML
+# loads as non-JSON types (dates) compare the way they are stored.
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def _index_by_id(items):
+    index = {}
+    for item in items:
+        key = item.get("id") if isinstance(item, dict) else None
+        if key is None or key in index:
+            return None
+        index[key] = item
+    return index
+
+
+def _reorder(mapping: dict, keys):
+    ordered = {key: mapping[key] for key in keys if key in mapping}
+    ordered.update((key, value) for key, value in mapping.items() if key not in ordered)
+    mapping.clear()
+    mapping.update(ordered)
+
+
+def diff_fields(old: dict, new: dict, skip: str = "") -> dict:
+    delta = {}
+    fields = {key: value for key, value in new.items() if key != skip and (key not in old or old[key] != value)}
+    removed = [key for key in old if key != skip and key not in new]
+    if fields:
+        delta["fields"] = copy.deepcopy(fields)
+    if removed:
+        delta["removed_fields"] = removed
+    return delta
+
+
+def apply_fields(target: dict, delta: dict):
+    for key in delta.get("removed_fields", []):
+        target.pop(key, None)
+    target.update(copy.deepcopy(delta.get("fields", {})))
+    if "key_order" in delta:
+        _reorder(target, delta["key_order"])
+
+
+def diff_rules(old_rules: list, new_rules: list) -> dict:
+    old_index = _index_by_id(old_rules)
+    new_index = _index_by_id(new_rules)
+    if old_index is None or new_index is None:
+        return {"rules": copy.deepcopy(new_rules)} if old_rules != new_rules else {}
+    delta = {}
+    added = [rule for rule in new_rules if rule["id"] not in old_index]
+    removed = [rule_id for rule_id in old_index if rule_id not in new_index]
+    changed = [rule for rule in new_rules if rule["id"] in old_index and old_index[rule["id"]] != rule]
+    if added:
+        delta["added"] = copy.deepcopy(added)
+    if removed:
+        delta["removed"] = removed
+    if changed:
+        delta["changed"] = copy.deepcopy(changed)
+    return delta
+
+
+def apply_rules(rules: list, delta: dict) -> list:
+    if "rules" in delta:
+        return copy.deepcopy(delta["rules"])
+    removed = set(delta.get("removed", []))
+    changed = {rule["id"]: rule for rule in delta.get("changed", [])}
+    result = [copy.deepcopy(changed.get(rule["id"], rule)) for rule in rules if rule["id"] not in removed]
+    result.extend(copy.deepcopy(delta.get("added", [])))
+    if "order" in delta:
+        position = {rule_id: number for number, rule_id in enumerate(delta["order"])}
+        result.sort(key=lambda rule: position[rule["id"]])
+    return result
+
+
+def apply_delta(catalog: dict, delta: dict) -> dict:
+    """Apply one history record to catalog in place and return it."""
+    apply_fields(catalog, delta)
+    removed_sets = set(delta.get("removed_sets", []))
+    rule_sets = [rule_set for rule_set in catalog.get("rule_sets", []) if rule_set.get("id") not in removed_sets]
+    by_id = {rule_set.get("id"): rule_set for rule_set in rule_sets}
+    for set_id, set_delta in delta.get("rule_sets", {}).items():
+        rule_set = by_id.get(set_id)
+        if rule_set is None:
+            rule_set = by_id[set_id] = {}
+            rule_sets.append(rule_set)
+        rules = rule_set.get("rules", [])
+        apply_fields(rule_set, {key: value for key, value in set_delta.items() if key != "key_order"})
+        rule_set["rules"] = apply_rules(rules, set_delta)
+        if "key_order" in set_delta:
+            _reorder(rule_set, set_delta["key_order"])
+    if "set_order" in delta:
+        position = {set_id: number for number, set_id in enumerate(delta["set_order"])}
+        rule_sets.sort(key=lambda rule_set: position[rule_set.get("id")])
+    if rule_sets or "rule_sets" in catalog:
+        catalog["rule_sets"] = rule_sets
+    if "key_order" in delta:
+        _reorder(catalog, delta["key_order"])
+    return catalog
+
+
+def make_delta(old: dict, new: dict) -> dict:
+    old_sets = old.get("rule_sets", [])
+    new_sets = new.get("rule_sets", [])
+    if _index_by_id(old_sets) is None or _index_by_id(new_sets) is None:
+        raise ValueError("rule set ids must be present and unique")
+
+    delta = diff_fields(old, new, skip="rule_sets")
+    old_by_id = {rule_set["id"]: rule_set for rule_set in old_sets}
+    new_ids = {rule_set["id"] for rule_set in new_sets}
+    set_deltas = {}
+    for rule_set in new_sets:
+        previous = old_by_id.get(rule_set["id"], {})
+        set_delta = diff_fields(previous, rule_set, skip="rules")
+        set_delta.update(diff_rules(previous.get("rules", []), rule_set.get("rules", [])))
+        if set_delta or rule_set["id"] not in old_by_id:
+            set_deltas[rule_set["id"]] = set_delta
+    if set_deltas:
+        delta["rule_sets"] = set_deltas
+    removed_sets = [rule_set["id"] for rule_set in old_sets if rule_set["id"] not in new_ids]
+    if removed_sets:
+        delta["removed_sets"] = removed_sets
+
+    # Record orderings only where applying the delta would not reproduce them.
+    rebuilt = apply_delta(copy.deepcopy(old), delta)
+    if list(rebuilt) != list(new):
+        delta["key_order"] = list(new)
+    if [rule_set["id"] for rule_set in rebuilt.get("rule_sets", [])] != [rule_set["id"] for rule_set in new_sets]:
+        delta["set_order"] = [rule_set["id"] for rule_set in new_sets]
+    rebuilt_by_id = {rule_set["id"]: rule_set for rule_set in rebuilt.get("rule_sets", [])}
+    for rule_set in new_sets:
+        rebuilt_set = rebuilt_by_id[rule_set["id"]]
+        if list(rebuilt_set) != list(rule_set):
+            set_deltas.setdefault(rule_set["id"], {})["key_order"] = list(rule_set)
+        rule_ids = [rule.get("id") for rule in rule_set.get("rules", [])]
+        if [rule.get("id") for rule in rebuilt_set.get("rules", [])] != rule_ids:
+            set_deltas.setdefault(rule_set["id"], {})["order"] = rule_ids
+    if set_deltas:
+        delta["rule_sets"] = set_deltas
+    return delta
+
+
+def _rule_events(date: str, set_id: str, set_delta: dict, rules: dict):
+    if "rules" in set_delta:
+        new_rules = {rule.get("id"): rule for rule in set_delta["rules"]}
+        added = [rule for rule_id, rule in new_rules.items() if rule_id not in rules]
+        removed = [rule_id for rule_id in rules if rule_id not in new_rules]
+        changed = [rule for rule_id, rule in new_rules.items() if rule_id in rules and rules[rule_id] != rule]
+    else:
+        added = set_delta.get("added", [])
+        removed = set_delta.get("removed", [])
+        changed = set_delta.get("changed", [])
+
+    for rule in added:
+        yield {"date": date, "rule_set": set_id, "rule_id": rule.get("id"), "event": "added", "title": rule.get("title", "")}
+    for rule_id in removed:
+        title = rules.get(rule_id, {}).get("title", "")
+        yield {"date": date, "rule_set": set_id, "rule_id": rule_id, "event": "removed", "title": title}
+    for rule in changed:
+        previous_title = rules.get(rule.get("id"), {}).get("title", "")
+        event = "retitled" if rule.get("title", "") != previous_title else "changed"
+        yield {
+            "date": date,
+            "rule_set": set_id,
+            "rule_id": rule.get("id"),
+            "event": event,
+            "title": rule.get("title", ""),
+            "previous_title": previous_title,
+        }
+
+    if "rules" in set_delta:
+        rules.clear()
+        rules.update({rule.get("id"): rule for rule in set_delta["rules"]})
+    else:
+        for rule_id in removed:
+            rules.pop(rule_id, None)
+        rules.update({rule["id"]: rule for rule in [*added, *changed]})
+
+
+class CatalogHistory:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.dates = []
+        self._offsets = []
+        self._keyframes = []
+        if not self.path.exists():
+            return
+        with self.path.open("rb") as fp:
+            offset = 0
+            for line in fp:
+                if line.strip():
+                    match = _RECORD_HEADER.match(line.decode("utf-8"))
+                    if not match:
+                        raise ValueError(f"{self.path}: malformed history record at byte {offset}")
+                    if match.group(2) == "true":
+                        self._keyframes.append(len(self.dates))
+                    self.dates.append(match.group(1))
+                    self._offsets.append(offset)
+                offset += len(line)
+
+    def __len__(self):
+        return len(self.dates)
+
+    def record(self, index: int) -> dict:
+        with self.path.open("rb") as fp:
+            fp.seek(self._offsets[index])
+            return json.loads(fp.readline())
+
+    def records(self):
+        with self.path.open("rb") as fp:
+            for offset in self._offsets:
+                fp.seek(offset)
+                yield json.loads(fp.readline())
+
+    def catalog_at(self, date: str):
+        """The catalog as of the last refresh on or before date, or None."""
+        index = bisect.bisect_right(self.dates, date) - 1
+        if index < 0:
+            return None
+        keyframe = self._keyframes[bisect.bisect_right(self._keyframes, index) - 1]
+        catalog = self.record(keyframe)["catalog"]
+        with self.path.open("rb") as fp:
+            for offset in self._offsets[keyframe + 1 : index + 1]:
+                fp.seek(offset)
+                apply_delta(catalog, json.loads(fp.readline()))
+        return catalog
+
+    def latest(self):
+        return self.catalog_at(self.dates[-1]) if self.dates else None
+
+    def rule_events(self, rule_set_id: str, rule_id: str = ""):
+        """Yield the added/removed/retitled/changed events of one rule set."""
+        rules = {}
+        for record in self.records():
+            if record.get("keyframe") and "catalog" in record:
+                rule_sets = {rule_set.get("id"): rule_set for rule_set in record["catalog"].get("rule_sets", [])}
+                if rule_set_id in rule_sets:
+                    set_delta = {"rules": rule_sets[rule_set_id].get("rules", [])}
+                else:
+                    set_delta = {"removed": list(rules)}
+            else:
+                set_delta = record.get("rule_sets", {}).get(rule_set_id)
+            if rule_set_id in record.get("removed_sets", []):
+                set_delta = {"removed": list(rules)}
+            if not set_delta:
+                continue
+            for event in _rule_events(record["date"], rule_set_id, set_delta, rules):
+                if not rule_id or event["rule_id"] == rule_id:
+                    yield event
+
+    def append(self, catalog: dict):
+        """Record catalog as the next refresh; returns False when it is unchanged."""
+        date = str(catalog.get("updated", ""))
+        if not date:
+            raise ValueError("catalog has no 'updated' date")
+        if self.dates and date < self.dates[-1]:
+            raise ValueError(f"catalog dated {date} is older than the last recorded refresh {self.dates[-1]}")
+        catalog = json.loads(_dumps(catalog))
+        previous = self.latest() or {}
+        if _dumps(previous) == _dumps(catalog):
+            return False
+
+        keyframe = len(self.dates) % KEYFRAME_INTERVAL == 0
+        if keyframe:
+            record = {"date": date, "keyframe": True, "catalog": catalog}
+        else:
+            record = {"date": date, "keyframe": False, **make_delta(previous, catalog)}
+        line = _dumps(record) + "\n"
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        offset = self.path.stat().st_size if self.path.exists() else 0
+        with self.path.open("a", encoding="utf-8") as fp:
+            fp.write(line)
+        if keyframe:
+            self._keyframes.append(len(self.dates))
+        self.dates.append(date)
+        self._offsets.append(offset)
+        return True
+
+
+def git_catalog_versions(path: str):
+    """Yield every committed version of path, oldest first."""
+    commits = subprocess.run(
+        ["git", "log", "--reverse", "--format=%H", "--", path], check=True, capture_output=True, text=True
+    ).stdout.split()
+    for commit in commits:
+        shown = subprocess.run(["git", "show", f"{commit}:{path}"], capture_output=True, text=True)
+        if shown.returncode == 0:
+            yield commit, yaml.safe_load(shown.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and query the delta-encoded rule catalog history")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="Path to the history JSON Lines file")
+    parser.add_argument("--record-yaml", default="", help="Append this catalog YAML as the next refresh")
+    parser.add_argument(
+        "--import-git",
+        default="",
+        help="Append every committed version of this catalog YAML path that is not older than the history",
+    )
+    parser.add_argument("--date", default="", help="Print the catalog as of this date (YYYY-MM-DD) as YAML")
+    parser.add_argument("--out-yaml", default="", help="Write the --date catalog here instead of stdout")
+    parser.add_argument("--rule-set", default="", help="Print the rule events of this rule set")
+    parser.add_argument("--rule", default="", help="Limit --rule-set events to this rule id")
+    args = parser.parse_args()
+
+    history = CatalogHistory(args.history)
+
+    if args.import_git:
+        recorded = 0
+        for commit, catalog in git_catalog_versions(args.import_git):
+            if history.dates and str(catalog.get("updated", "")) < history.dates[-1]:
+                continue
+            recorded += history.append(catalog)
+        print(f"recorded={recorded} records={len(history)}")
+
+    if args.record_yaml:
+        catalog = yaml.safe_load(Path(args.record_yaml).read_text(encoding="utf-8"))
+        recorded = history.append(catalog)
+        print(f"recorded={int(recorded)} records={len(history)}")
+
+    if args.date:
+        catalog = history.catalog_at(args.date)
+        if catalog is None:
+            raise SystemExit(f"No catalog recorded on or before {args.date}")
+        text = yaml.safe_dump(catalog, sort_keys=False, allow_unicode=True)
+        if args.out_yaml:
+            Path(args.out_yaml).write_text(text, encoding="utf-8")
+            print(f"out={args.out_yaml}")
+        else:
+            sys.stdout.write(text)
+
+    if args.rule_set:
+        for event in history.rule_events(args.rule_set, args.rule):
+            line = f"{event['date']}\t{event['event']}\t{event['rule_id']}\t{event['title']}"
+            if event["event"] == "retitled":
+                line += f"\t(was: {event['previous_title']})"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
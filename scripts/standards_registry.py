@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+import re
+
+# Registry of the standards known to the cross-standard reference scripts.
+# Adding a standard is a data change here: aliases feed normalize_standard_id,
+# "normative" entries become --<arg>-yaml inputs of the generator/validator,
+# and mention families feed the normative text scanner.
+
+RESEARCH_DIR = "kitty-specs/001-wai-standards-yaml-ld-ingestion/research/"
+
+STANDARDS = [
+    {
+        "id": "wcag-2.2",
+        "aliases": ["wcag-2.2"],
+        "tr_url": "https://www.w3.org/TR/WCAG22/",
+        "normative": {
+            "arg": "wcag22",
+            "source_input": "wcag_22_normative",
+            "yaml": RESEARCH_DIR + "wcag-2.2-normative.yaml",
+        },
+    },
+    {
+        "id": "wcag-2.0",
+        "aliases": ["wcag-2.0", "wcag-2.0-legacy"],
+        "tr_url": "https://www.w3.org/TR/WCAG20/",
+        "normative": {
+            "arg": "wcag20",
+            "source_input": "wcag_20_normative",
+            "yaml": RESEARCH_DIR + "wcag-2.0-normative.yaml",
+        },
+    },
+    {
+        "id": "atag-2.0",
+        "aliases": ["atag-2.0", "atag-2"],
+        "tr_url": "https://www.w3.org/TR/ATAG20/",
+        "normative": {
+            "arg": "atag",
+            "source_input": "atag_20_normative",
+            "yaml": RESEARCH_DIR + "atag-2.0-normative.yaml",
+        },
+    },
+    {
+        "id": "uaag-2.0",
+        "aliases": ["uaag-2.0", "uaag-2"],
+        "tr_url": "https://www.w3.org/TR/UAAG20/",
+        "normative": {
+            "arg": "uaag",
+            "source_input": "uaag_20_normative",
+            "yaml": RESEARCH_DIR + "uaag-2.0-normative.yaml",
+        },
+    },
+    {
+        "id": "wai-aria-1.2",
+        "aliases": ["wai-aria-1.2", "wai-aria", "aria"],
+        "tr_url": "https://www.w3.org/TR/wai-aria-1.2/",
+        "normative": None,
+    },
+]
+
+# Explicit mentions of a standard in normative text. A family resolves to the
+# first standard whose version marker occurs anywhere in the text, otherwise
+# to its default. leading_chars lists every character the pattern can start
+# with (case-insensitive) so the scanner can skip other positions.
+MENTION_FAMILIES = {
+    "wcag": {
+        "pattern": r"\bWCAG(?:\s*2\.0|\s*2\.1|\s*2\.2)?\b",
+        "leading_chars": "W",
+        "version_markers": [("2.0", "wcag-2.0"), ("2.2", "wcag-2.2")],
+        "default": "wcag-2.0",
+    },
+    "atag": {
+        "pattern": r"\bATAG(?:\s*2\.0)?\b",
+        "leading_chars": "A",
+        "default": "atag-2.0",
+    },
+    "uaag": {
+        "pattern": r"\bUAAG(?:\s*2\.0)?\b",
+        "leading_chars": "U",
+        "default": "uaag-2.0",
+    },
+    "aria": {
+        "pattern": r"\bWAI-ARIA\b|\bARIA\b",
+        "leading_chars": "WA",
+        "default": "wai-aria-1.2",
+    },
+}
+
+# When normative text cites an SC code alongside explicit standard mentions,
+# the code is resolved against the first mentioned standard in this order.
+SC_REFERENCE_PRECEDENCE = ["wcag-2.0", "wcag-2.2", "atag-2.0", "uaag-2.0"]
+
+STANDARDS_BY_ID = {entry["id"]: entry for entry in STANDARDS}
+NORMATIVE_STANDARDS = [entry for entry in STANDARDS if entry.get("normative")]
+STANDARD_ALIASES = {
+    alias.lower(): entry["id"] for entry in STANDARDS for alias in [entry["id"], *entry["aliases"]]
+}
+VERSION_MARKERS = sorted(
+    {marker for family in MENTION_FAMILIES.values() for marker, _ in family.get("version_markers", [])}
+)
+
+
+def normalize_standard_id(raw) -> str:
+    value = str(raw).strip()
+    return STANDARD_ALIASES.get(value.lower(), value)
+
+
+def mention_leading_chars() -> str:
+    chars = {char for family in MENTION_FAMILIES.values() for char in family["leading_chars"]}
+    chars.update(marker[0] for marker in VERSION_MARKERS)
+    return "".join(sorted(re.escape(char) for char in chars))
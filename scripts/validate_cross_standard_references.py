@@ -4,6 +4,10 @@ from pathlib import Path
 
 import yaml
 
+from cross_reference_links import Link
+from cross_reference_snapshot import load_snapshot_links
+from standards_registry import NORMATIVE_STANDARDS, STANDARDS_BY_ID, normalize_standard_id
+
 
 def load_yaml(path: Path):
     data = yaml.safe_load(path.read_text(encoding="utf-8"))
@@ -12,23 +16,6 @@ def load_yaml(path: Path):
     return data
 
 
-def norm_standard(raw: str) -> str:
-    value = str(raw).strip().lower()
-    mapping = {
-        "wcag-2.2": "wcag-2.2",
-        "wcag-2.0": "wcag-2.0",
-        "wcag-2.0-legacy": "wcag-2.0",
-        "atag-2.0": "atag-2.0",
-        "atag-2": "atag-2.0",
-        "uaag-2.0": "uaag-2.0",
-        "uaag-2": "uaag-2.0",
-        "wai-aria": "wai-aria-1.2",
-        "aria": "wai-aria-1.2",
-        "wai-aria-1.2": "wai-aria-1.2",
-    }
-    return mapping.get(value, str(raw).strip())
-
-
 def criterion_index(normative_data: dict):
     out = set()
     for item in normative_data.get("normative_success_criteria", []):
@@ -44,7 +31,7 @@ def informative_applies_to_index(informative_data: dict):
         resource_id = str(item.get("id", "")).strip()
         targets = set()
         for target in item.get("applies_to", []):
-            targets.add(norm_standard(str(target)))
+            targets.add(normalize_standard_id(str(target)))
         if resource_id:
             out[resource_id] = targets
     return out
@@ -57,15 +44,17 @@ def validate_links(links_data: dict, crit_index: dict, profile_membership: dict,
         return ["links must be a list"]
 
     seen_link_ids = set()
-    known_standards = set(crit_index.keys()) | {"wai-aria-1.2"}
+    known_standards = set(STANDARDS_BY_ID)
 
     for link in links:
-        if not isinstance(link, dict):
+        if isinstance(link, dict):
+            link = Link.from_dict(link)
+        elif not isinstance(link, Link):
             failures.append("each link entry must be an object")
             continue
 
-        link_id = str(link.get("link_id", "<missing>"))
-        if not link_id or link_id == "<missing>":
+        link_id = link.link_id
+        if not link_id:
             failures.append("link missing link_id")
             continue
         if link_id in seen_link_ids:
@@ -73,14 +62,14 @@ def validate_links(links_data: dict, crit_index: dict, profile_membership: dict,
             continue
         seen_link_ids.add(link_id)
 
-        relation = str(link.get("relation_type", ""))
-        basis = str(link.get("basis", ""))
+        relation = link.relation_type
+        basis = link.basis
 
-        source_standard = norm_standard(str(link.get("source_standard_id", "")))
-        target_standard = norm_standard(str(link.get("target_standard_id", "")))
-        source_sc = str(link.get("source_criterion_code", "")).strip()
-        target_sc = str(link.get("target_criterion_code", "")).strip()
-        profile_ref = str(link.get("target_profile_ref", "")).strip()
+        source_standard = normalize_standard_id(link.source_standard_id)
+        target_standard = normalize_standard_id(link.target_standard_id)
+        source_sc = link.source_criterion_code.strip()
+        target_sc = link.target_criterion_code.strip()
+        profile_ref = link.target_profile_ref.strip()
 
         if source_standard and source_standard not in known_standards:
             failures.append(f"{link_id}: unknown source_standard_id '{source_standard}'")
@@ -135,7 +124,7 @@ def validate_links(links_data: dict, crit_index: dict, profile_membership: dict,
         elif relation == "informative_resource_reference_standard":
             if basis != "catalog_applies_to":
                 failures.append(f"{link_id}: informative relation must have basis=catalog_applies_to")
-            resource_id = str(link.get("source_resource_id", "")).strip()
+            resource_id = link.source_resource_id.strip()
             if not resource_id:
                 failures.append(f"{link_id}: informative relation missing source_resource_id")
                 continue
@@ -154,28 +143,30 @@ def validate_links(links_data: dict, crit_index: dict, profile_membership: dict,
 
 def main():
     parser = argparse.ArgumentParser(description="Validate cross-standard references dataset integrity")
-    parser.add_argument("--dataset-yaml", required=True)
-    parser.add_argument("--wcag22-yaml", required=True)
-    parser.add_argument("--wcag20-yaml", required=True)
-    parser.add_argument("--atag-yaml", required=True)
-    parser.add_argument("--uaag-yaml", required=True)
+    parser.add_argument("--dataset-yaml", default="")
+    parser.add_argument(
+        "--dataset-snapshot",
+        default="",
+        help="Validate links from a columnar snapshot instead of --dataset-yaml",
+    )
+    for entry in NORMATIVE_STANDARDS:
+        parser.add_argument(f"--{entry['normative']['arg']}-yaml", default=entry["normative"]["yaml"])
     parser.add_argument("--crosswalk-yaml", required=True)
     parser.add_argument("--informative-yaml", required=True)
     args = parser.parse_args()
 
-    dataset = load_yaml(Path(args.dataset_yaml))
-    wcag22 = load_yaml(Path(args.wcag22_yaml))
-    wcag20 = load_yaml(Path(args.wcag20_yaml))
-    atag = load_yaml(Path(args.atag_yaml))
-    uaag = load_yaml(Path(args.uaag_yaml))
+    if args.dataset_snapshot:
+        dataset = {"links": load_snapshot_links(Path(args.dataset_snapshot))}
+    elif args.dataset_yaml:
+        dataset = load_yaml(Path(args.dataset_yaml))
+    else:
+        parser.error("Specify --dataset-yaml or --dataset-snapshot")
     crosswalk = load_yaml(Path(args.crosswalk_yaml))
     informative = load_yaml(Path(args.informative_yaml))
 
     crit_index = {
-        "wcag-2.2": criterion_index(wcag22),
-        "wcag-2.0": criterion_index(wcag20),
-        "atag-2.0": criterion_index(atag),
-        "uaag-2.0": criterion_index(uaag),
+        entry["id"]: criterion_index(load_yaml(Path(getattr(args, f"{entry['normative']['arg']}_yaml"))))
+        for entry in NORMATIVE_STANDARDS
     }
 
     profiles = crosswalk.get("target_profiles", {})
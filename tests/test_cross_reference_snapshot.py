@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Round trips and damaged files for the columnar cross-reference snapshot."""
+import struct
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from cross_reference_snapshot import Snapshot, write_snapshot  # noqa: E402
+
+FIELDNAMES = ["link_id", "relation_type", "source_standard_id"]
+LINKS = [
+    {"link_id": "1", "relation_type": "direct_sc_reference", "source_standard_id": "atag-2.0"},
+    {"link_id": "2", "relation_type": "direct_sc_reference", "source_standard_id": "uaag-2.0"},
+    {"link_id": "3", "relation_type": "informative", "source_standard_id": "atag-2.0"},
+]
+
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "links.snapshot"
+        write_snapshot(self.path, LINKS, FIELDNAMES)
+        self.data = self.path.read_bytes()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        with Snapshot(self.path) as snapshot:
+            self.assertEqual(list(snapshot.rows()), LINKS)
+            self.assertEqual(snapshot.row(1), LINKS[1])
+            self.assertEqual(list(snapshot.rows_at([2, 0])), [LINKS[2], LINKS[0]])
+
+    def test_truncated_file_raises_value_error(self):
+        damaged = self.path.with_name("damaged.snapshot")
+        for length in range(len(self.data)):
+            damaged.write_bytes(self.data[:length])
+            with self.assertRaises(ValueError, msg=f"truncated to {length} bytes"):
+                Snapshot(damaged)
+
+    def test_invalid_dictionary_offsets_raise_value_error(self):
+        # The first column's offsets start after its name and the
+        # dictionary_count/blob_length pair.
+        name_length = len(FIELDNAMES[0])
+        offsets_pos = 20 + 4 + name_length + (4 - name_length % 4) % 4 + 8
+        damaged = bytearray(self.data)
+        struct.pack_into("<I", damaged, offsets_pos + 4, 0xFFFF)
+        self.path.write_bytes(bytes(damaged))
+        with Snapshot(self.path) as snapshot:
+            with self.assertRaises(ValueError):
+                snapshot.dictionary(FIELDNAMES[0])
+
+    def test_code_outside_dictionary_raises_value_error(self):
+        with Snapshot(self.path) as snapshot:
+            codes_pos = snapshot._layout[FIELDNAMES[-1]][3]
+        damaged = bytearray(self.data)
+        struct.pack_into("<I", damaged, codes_pos + 4, 7)
+        self.path.write_bytes(bytes(damaged))
+        with Snapshot(self.path) as snapshot:
+            self.assertEqual(list(snapshot.rows_at([0])), LINKS[:1])
+            with self.assertRaisesRegex(ValueError, "source_standard_id"):
+                list(snapshot.rows_at([1]))
+            with self.assertRaisesRegex(ValueError, "source_standard_id"):
+                list(snapshot.rows())
+
+
+if __name__ == "__main__":
+    unittest.main()
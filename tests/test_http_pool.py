@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Error mapping of the shared connection pool against raw local servers,
+and the atomic file writes shared by the scripts."""
+import socket
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from urllib.error import URLError
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from http_pool import ConnectionPool, atomic_open, atomic_write_text  # noqa: E402
+
+
+def serve_once(response: bytes):
+    """Answer one connection on 127.0.0.1 with a fixed raw response."""
+    listener = socket.create_server(("127.0.0.1", 0))
+
+    def answer():
+        conn, _ = listener.accept()
+        with conn:
+            conn.recv(65536)
+            conn.sendall(response)
+        listener.close()
+
+    threading.Thread(target=answer, daemon=True).start()
+    return f"http://127.0.0.1:{listener.getsockname()[1]}/"
+
+
+class MalformedResponseTest(unittest.TestCase):
+    def assert_url_error(self, response: bytes):
+        url = serve_once(response)
+        with ConnectionPool(timeout=5) as pool:
+            with self.assertRaises(URLError):
+                pool.read(url)
+
+    def test_bad_status_line(self):
+        self.assert_url_error(b"NOT-HTTP\r\n\r\n")
+
+    def test_header_line_too_long(self):
+        self.assert_url_error(b"HTTP/1.1 200 OK\r\nX-Long: " + b"a" * 70000 + b"\r\n\r\n")
+
+    def test_connection_refused(self):
+        listener = socket.create_server(("127.0.0.1", 0))
+        port = listener.getsockname()[1]
+        listener.close()
+        with ConnectionPool(timeout=5) as pool:
+            with self.assertRaises(URLError):
+                pool.read(f"http://127.0.0.1:{port}/")
+
+
+class AtomicWriteTest(unittest.TestCase):
+    def test_failed_write_keeps_target_and_removes_tmp(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "nested" / "cache.json"
+            atomic_write_text(path, "old")
+            with self.assertRaises(RuntimeError):
+                with atomic_open(path) as fp:
+                    fp.write("partial")
+                    raise RuntimeError("interrupted")
+            self.assertEqual(path.read_text(encoding="utf-8"), "old")
+            self.assertEqual(sorted(p.name for p in path.parent.iterdir()), ["cache.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Filter specs accepted by the --serve mode of the reference query script."""
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from cross_reference_links import LINK_FIELDNAMES, Link  # noqa: E402
+from cross_reference_snapshot import write_snapshot  # noqa: E402
+from query_cross_standard_references import (  # noqa: E402
+    build_index,
+    filter_links,
+    index_links,
+    index_rows_path,
+    load_index,
+    query_index,
+    run_filter_spec,
+)
+
+LINKS = [
+    Link(link_id="1", relation_type="direct_sc_reference", source_standard_id="atag-2.0", target_standard_id="wcag-2.2"),
+    Link(link_id="2", relation_type="direct_sc_reference", source_standard_id="uaag-2.0", target_standard_id="wcag-2.2"),
+    Link(
+        link_id="3",
+        relation_type="direct_sc_reference_intra_standard",
+        source_standard_id="wcag-2.2",
+        target_standard_id="wcag-2.2",
+    ),
+]
+
+
+class FilterSpecTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with tempfile.NamedTemporaryFile() as dataset:
+            cls.index = build_index(LINKS, Path(dataset.name))
+
+    def test_null_means_no_filter(self):
+        result = run_filter_spec(
+            self.index,
+            {"source_standard": None, "relation_types": None, "include_intra": None, "limit": None},
+        )
+        self.assertEqual(result["matches"], 2)
+        self.assertEqual(run_filter_spec(self.index, {"source_standard": "atag-2.0"})["matches"], 1)
+
+    def test_limit_and_include_intra_types(self):
+        self.assertEqual(len(run_filter_spec(self.index, {"limit": 1, "include_intra": True})["links"]), 1)
+        self.assertEqual(run_filter_spec(self.index, {"include_intra": True})["matches"], 3)
+        for spec in ({"limit": 1.5}, {"limit": True}, {"limit": "2"}, {"include_intra": "yes"}, {"include_intra": 1}):
+            with self.assertRaises(ValueError, msg=spec):
+                run_filter_spec(self.index, spec)
+
+
+class StoredIndexTest(unittest.TestCase):
+    FILTERS = {
+        "source_standard": "",
+        "source_sc": "",
+        "target_standard": "wcag-2.2",
+        "target_sc": "",
+        "relation_types": [],
+        "basis": "",
+        "include_intra": False,
+    }
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.dir = Path(self.tmp.name)
+
+    def assert_index_matches_scan(self, index_path, dataset_path, rows_path):
+        def read_links(path):
+            return list(LINKS)
+
+        load_index(index_path, dataset_path, read_links, rows_path)
+        self.assertNotIn("links", json.loads(index_path.read_text(encoding="utf-8")))
+
+        # The second load reuses the stored postings without reading the dataset.
+        def fail(path):
+            raise AssertionError("dataset reread")
+
+        index = load_index(index_path, dataset_path, fail, rows_path)
+        positions = query_index(index, **self.FILTERS)
+        self.assertEqual(
+            [link.to_dict() for link in index_links(index, positions)],
+            [link.to_dict() for link in filter_links(LINKS, **self.FILTERS)],
+        )
+
+    def test_yaml_dataset_rows_come_from_sidecar_snapshot(self):
+        dataset_path = self.dir / "links.yaml"
+        dataset_path.write_text("links: []\n", encoding="utf-8")
+        index_path = self.dir / "links.index.json"
+        self.assert_index_matches_scan(index_path, dataset_path, None)
+        self.assertTrue(index_rows_path(index_path).exists())
+
+    def test_snapshot_dataset_rows_come_from_dataset(self):
+        dataset_path = self.dir / "links.snapshot"
+        write_snapshot(dataset_path, (link.to_dict() for link in LINKS), LINK_FIELDNAMES)
+        index_path = self.dir / "links.index.json"
+        self.assert_index_matches_scan(index_path, dataset_path, dataset_path)
+        self.assertFalse(index_rows_path(index_path).exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
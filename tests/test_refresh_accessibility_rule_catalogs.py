@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Offline refresh of the rule catalogs against recorded source pages.
+
+The pages under fixtures/rule-catalog-sources/<host>/<path> are served by a
+local http.server and fetched through --mirror-url, the same way an offline
+run of the refresh script does.
+"""
+import functools
+import json
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import yaml
+
+TESTS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(TESTS_DIR.parent / "scripts"))
+
+import refresh_accessibility_rule_catalogs as refresh  # noqa: E402
+from http_pool import ConnectionPool  # noqa: E402
+
+FIXTURES_DIR = TESTS_DIR / "fixtures"
+SOURCES_DIR = FIXTURES_DIR / "rule-catalog-sources"
+EXPECTED_YAML = FIXTURES_DIR / "accessibility-rule-catalogs.expected.yaml"
+
+
+class RecordedSourceHandler(SimpleHTTPRequestHandler):
+    # HTTP/1.1 so that connections are kept alive between requests.
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ExtractorTest(unittest.TestCase):
+    def read_source(self, name):
+        url = refresh.SOURCES[name][0]
+        path = SOURCES_DIR / refresh.mirror_source_url(url, "").split("://", 1)[1]
+        return (path / "index.html" if path.is_dir() else path).read_text(encoding="utf-8")
+
+    def test_anchors_inside_script_are_ignored(self):
+        # The recorded axe page holds a rule link in a <script> template;
+        # it is not a rendered link and is not extracted.
+        html = self.read_source("axe")
+        self.assertIn('href="/rules/axe/4.11/region"', html)
+        self.assertNotIn("region", [rule["id"] for rule in refresh.extract_axe_rules(html)])
+
+    def test_chunked_input_matches_whole_page(self):
+        for name in ("act", "axe", "alfa"):
+            html = self.read_source(name)
+            extract = refresh.SOURCES[name][2]
+            chunks = (html[start : start + 7] for start in range(0, len(html), 7))
+            self.assertEqual(extract(chunks), extract(html), name)
+
+
+class RecordedSourcesTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        handler = functools.partial(RecordedSourceHandler, directory=str(SOURCES_DIR))
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        cls.server.daemon_threads = True
+        cls.server.lock = threading.Lock()
+        cls.server.connections = 0
+        cls.mirror_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        with self.server.lock:
+            self.server.connections = 0
+
+    def test_catalog_matches_expected(self):
+        extracted = refresh.refresh_sources(self.mirror_url)
+        self.assertEqual({status for _, status in extracted.values()}, {"fetched"})
+        catalog = refresh.build_catalog(*(extracted[name][0] for name in ("act", "axe", "alfa", "qualweb")))
+        expected = yaml.safe_load(EXPECTED_YAML.read_text(encoding="utf-8"))
+        self.assertEqual(catalog["rule_sets"], expected["rule_sets"])
+
+    def test_connections_are_reused_per_host(self):
+        with ConnectionPool(headers={"User-Agent": refresh.USER_AGENT}) as pool:
+            for _ in range(2):
+                for name in refresh.SOURCES:
+                    refresh.refresh_source(pool, name, self.mirror_url)
+            self.assertEqual(pool.connections_opened, 1)
+
+            # A second host name for the same server gets its own connection.
+            other_host = self.mirror_url.replace("127.0.0.1", "localhost")
+            for name in refresh.SOURCES:
+                refresh.refresh_source(pool, name, other_host)
+            self.assertEqual(pool.connections_opened, 2)
+        self.assertEqual(self.server.connections, 2)
+
+    def test_http_cache_reuses_extraction_and_survives_bad_entries(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            first = refresh.refresh_sources(self.mirror_url, cache_dir)
+            second = refresh.refresh_sources(self.mirror_url, cache_dir)
+            self.assertEqual({status for _, status in second.values()}, {"not_modified"})
+            self.assertEqual(second, {name: (rules, "not_modified") for name, (rules, _) in first.items()})
+
+            # Unreadable extraction entries are cache misses and are rewritten.
+            extraction_paths = sorted(Path(cache_dir).glob("*.rules.json"))
+            self.assertEqual(len(extraction_paths), len(refresh.SOURCES))
+            for path, content in zip(extraction_paths, ("[]", '"rules"', "{truncated", "")):
+                path.write_text(content, encoding="utf-8")
+            third = refresh.refresh_sources(self.mirror_url, cache_dir)
+            self.assertEqual(third, second)
+            self.assertEqual(list(Path(cache_dir).glob("*.tmp")), [])
+            for path in extraction_paths:
+                self.assertIsInstance(json.loads(path.read_text(encoding="utf-8")), dict)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Round trips through the delta-encoded rule catalog history."""
+import copy
+import datetime
+import sys
+import tempfile
+import unittest
+import unittest.mock
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import rule_catalog_history  # noqa: E402
+from rule_catalog_history import CatalogHistory  # noqa: E402
+
+
+def catalog(date, rules):
+    return {
+        "updated": date,
+        "rule_sets": [{"id": "axe", "rules": [{"id": rule_id, "title": title} for rule_id, title in rules]}],
+    }
+
+
+class CatalogHistoryTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "history.jsonl"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_keyframes_store_only_the_catalog(self):
+        versions = [
+            catalog("2026-01-01", [("a", "A")]),
+            catalog("2026-02-01", [("a", "A"), ("b", "B")]),
+            catalog("2026-03-01", [("b", "B2")]),
+            catalog("2026-04-01", [("b", "B2"), ("c", "C")]),
+        ]
+        history = CatalogHistory(self.path)
+        with unittest.mock.patch.object(rule_catalog_history, "KEYFRAME_INTERVAL", 2):
+            for version in versions:
+                self.assertTrue(history.append(copy.deepcopy(version)))
+
+        reopened = CatalogHistory(self.path)
+        records = list(reopened.records())
+        self.assertEqual([record["keyframe"] for record in records], [True, False, True, False])
+        for record, version in zip(records, versions):
+            if record["keyframe"]:
+                self.assertEqual(record, {"date": version["updated"], "keyframe": True, "catalog": version})
+        for version in versions:
+            self.assertEqual(reopened.catalog_at(version["updated"]), version)
+
+        events = [(event["date"], event["event"], event["rule_id"]) for event in reopened.rule_events("axe")]
+        self.assertEqual(
+            events,
+            [
+                ("2026-01-01", "added", "a"),
+                ("2026-02-01", "added", "b"),
+                ("2026-03-01", "removed", "a"),
+                ("2026-03-01", "retitled", "b"),
+                ("2026-04-01", "added", "c"),
+            ],
+        )
+
+    def test_date_values_are_stored_as_strings(self):
+        history = CatalogHistory(self.path)
+        version = catalog(datetime.date(2026, 4, 1), [("a", "A")])
+        self.assertTrue(history.append(copy.deepcopy(version)))
+        self.assertFalse(history.append(copy.deepcopy(version)))
+        self.assertEqual(history.latest()["updated"], "2026-04-01")
+
+
+if __name__ == "__main__":
+    unittest.main()